@@ -0,0 +1,128 @@
+"""
+Tectonic emission, surface-hole and Rydberg sensor simulation.
+
+The submodules are imported on first access of one of their names, so
+`from Plate_sim import SurfaceHoleAccumulator` loads numpy and scipy only:
+
+    tectonic          simulate_tectonic_emissions* (numpy, pandas)
+    surface           burst detection and the surface_holes kernels (numpy, scipy)
+    tiled_surface     shared-memory tiled surface step over worker processes
+    telemetry         SimulationMetrics (standard library)
+    simulation        the full simulations and SurfaceHoleStepper
+    time_differences  LANL acoustic CSV ingestion (pandas)
+    acoustic_store    memory-mapped acoustic datasets (numpy, pandas)
+    seismic_features  per-window features of acoustic signals (numpy, pandas)
+    rydberg           Rydberg sensor model (rydiqule)
+    qpe               batched phase estimation (numpy; qiskit for the Aer path)
+    results           chunked on-disk simulation outputs (numpy, pandas)
+
+rydiqule is only imported when a Rydberg name is used, e.g. by a full
+simulation run with the default measurement_function. np, pd and plt are
+still exported for `from Plate_sim import *` in the notebooks.
+"""
+import importlib
+
+__version__ = "0.1.0"
+
+_SUBMODULE_NAMES = {
+    "tectonic": (
+        "simulate_tectonic_emissions",
+        "simulate_tectonic_emissions_and_seismic",
+    ),
+    "surface": (
+        "BURST_BANDS",
+        "BURST_ENERGY_KEYS",
+        "BURST_J_PER_TESLA",
+        "BurstMapTimes",
+        "SparseSnapshots",
+        "SparseSurfaceHoles",
+        "SurfaceHoleAccumulator",
+        "burst_energies_to_dicts",
+        "detect_ionization_bursts",
+        "simulate_ionization_bursts",
+        "update_surface_hole_accumulation",
+    ),
+    "tiled_surface": (
+        "TiledSurface",
+        "gaussian_radius",
+        "tile_bounds",
+    ),
+    "rydberg": (
+        "MU_B_OVER_HBAR",
+        "RydbergDMTable",
+        "fmt_B",
+        "rebuild_full_rho_from_vector",
+        "rydberg_dm_fixed_lasers",
+        "rydberg_dm_scan",
+    ),
+    "telemetry": (
+        "JsonLinesSink",
+        "NULL_METRICS",
+        "SIMULATION_COUNTERS",
+        "SIMULATION_STAGES",
+        "SimulationMetrics",
+    ),
+    "simulation": (
+        "STEPPER_CHECKPOINT_FILE",
+        "STEPPER_CHUNK_OUTPUTS",
+        "SurfaceHoleStepper",
+        "build_arrival_schedule",
+        "measure_sensor_fields",
+        "run_full_surface_hole_simulation_from_data",
+        "run_full_surface_hole_simulation_with_ionization",
+    ),
+    "qpe": (
+        "PhaseEstimator",
+        "QPE_BASIS_GATES",
+        "phases_from_rho",
+        "qpe_circuit",
+        "qpe_probabilities",
+        "transpiled_qpe_circuit",
+    ),
+    "results": (
+        "RESULTS_FORMAT",
+        "ChunkedArray",
+        "SimulationResults",
+        "save_simulation_results",
+    ),
+    "time_differences": (
+        "compute_time_differences",
+        "iter_time_differences",
+    ),
+    "acoustic_store": (
+        "LANL_DTYPES",
+        "AcousticDataset",
+        "convert_acoustic_csv",
+    ),
+    "seismic_features": (
+        "FEATURE_NAMES",
+        "strided_windows",
+        "window_features",
+        "window_features_frame",
+    ),
+}
+_LAZY_NAMES = {name: module for module, names in _SUBMODULE_NAMES.items() for name in names}
+
+# module aliases the notebooks took from the former single-file module
+_LAZY_MODULES = {
+    "np": "numpy",
+    "pd": "pandas",
+    "plt": "matplotlib.pyplot",
+}
+
+__all__ = sorted(_LAZY_NAMES) + sorted(_LAZY_MODULES)
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        value = getattr(importlib.import_module(f".{_LAZY_NAMES[name]}", __name__), name)
+    elif name in _LAZY_MODULES:
+        value = importlib.import_module(_LAZY_MODULES[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,128 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+HEADER_FILE = "header.json"
+FAILURE_STARTS_FILE = "failure_starts.npy"
+LANL_DTYPES = {"acoustic_data": np.int16, "time_to_failure": np.float32}
+
+
+def convert_acoustic_csv(
+    csv_path,
+    out_dir,
+    dtypes=LANL_DTYPES,                   # column -> dtype of the stored column
+    failure_column="time_to_failure",     # column whose upward jumps start a new cycle
+    chunksize=5_000_000                   # CSV rows parsed at a time
+):
+    """
+    One-time conversion of an acoustic CSV (e.g. LANL train.csv) into a
+    directory of raw little-endian column files plus a small JSON header and
+    an index of failure-cycle boundaries, to be opened with AcousticDataset.
+
+    The CSV is streamed, so memory is bounded by chunksize. The header is
+    written last: a directory without one is an interrupted conversion.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    header_path = os.path.join(out_dir, HEADER_FILE)
+    if os.path.exists(header_path):
+        os.remove(header_path)
+
+    columns = list(dtypes)
+    files = {name: open(os.path.join(out_dir, f"{name}.bin"), "wb") for name in columns}
+    failure_starts = [np.zeros(1, dtype=np.int64)]
+    n_rows = 0
+    last_failure_value = None
+
+    try:
+        for chunk in pd.read_csv(csv_path, usecols=columns, dtype=dtypes, chunksize=chunksize):
+            for name in columns:
+                chunk[name].to_numpy().astype(np.dtype(dtypes[name]).newbyteorder("<")).tofile(files[name])
+
+            if failure_column in dtypes and len(chunk):
+                ttf = chunk[failure_column].to_numpy()
+                prev = np.concatenate(([ttf[0] if last_failure_value is None else last_failure_value], ttf[:-1]))
+                failure_starts.append(n_rows + np.flatnonzero(ttf > prev))
+                last_failure_value = ttf[-1]
+            n_rows += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+    if n_rows == 0:
+        failure_starts = [np.zeros(0, dtype=np.int64)]
+    np.save(os.path.join(out_dir, FAILURE_STARTS_FILE), np.concatenate(failure_starts).astype(np.int64))
+
+    header = {
+        "format": 1,
+        "n_rows": n_rows,
+        "columns": [
+            {"name": name, "dtype": np.dtype(dtypes[name]).newbyteorder("<").str, "file": f"{name}.bin"}
+            for name in columns
+        ],
+        "failure_column": failure_column if failure_column in dtypes else None,
+        "source": os.path.abspath(csv_path),
+    }
+    with open(header_path, "w") as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+class AcousticDataset:
+    """
+    Read-only, memory-mapped view of a directory written by
+    convert_acoustic_csv. Columns are np.memmap arrays, so windows and
+    strides are sliced without copying and several processes opening the
+    same directory share the OS page cache. Pickling only sends the path,
+    so datasets can be handed to process-pool workers.
+
+    Values have the dtypes they were converted with: under LANL_DTYPES,
+    time_to_failure is float32 and so only carries ~7 significant digits of
+    the CSV text. Convert with np.float64 where full precision matters.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            self.header = json.load(f)
+        self.n_rows = self.header["n_rows"]
+        self.columns = {}
+        for col in self.header["columns"]:
+            file_path = os.path.join(path, col["file"])
+            if self.n_rows:
+                self.columns[col["name"]] = np.memmap(
+                    file_path, dtype=np.dtype(col["dtype"]), mode="r", shape=(self.n_rows,))
+            else:
+                self.columns[col["name"]] = np.empty(0, dtype=np.dtype(col["dtype"]))
+        self.failure_starts = np.load(os.path.join(path, FAILURE_STARTS_FILE))
+
+    def __reduce__(self):
+        return (AcousticDataset, (self.path,))
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def column(self, idx):
+        """Column by position, in the order of the dtypes it was converted with."""
+        return self.columns[self.header["columns"][idx]["name"]]
+
+    @property
+    def acoustic_data(self):
+        return self.columns["acoustic_data"]
+
+    @property
+    def time_to_failure(self):
+        return self.columns["time_to_failure"]
+
+    def window(self, start, stop, stride=1, column="acoustic_data"):
+        """Zero-copy view of rows start:stop:stride of one column."""
+        return self.columns[column][start:stop:stride]
+
+    def cycles(self):
+        """(start, stop) row ranges of the failure cycles."""
+        bounds = np.append(self.failure_starts, self.n_rows)
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
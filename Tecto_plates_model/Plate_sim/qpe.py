@@ -0,0 +1,187 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def qpe_circuit(unitary_phase, psi_params=None, n_estimation_qubits=3, n_target_qubits=1, measure=True):
+    """
+    Quantum phase estimation of U = P(2π·unitary_phase) on the target
+    register, as qpe_qiskit of NYUAD_QCircuit.ipynb. unitary_phase may be a
+    qiskit Parameter, so one circuit serves every phase.
+
+    The target starts in |1⟩, or in U3(*psi_params)|0⟩ copied by CX onto
+    the other target qubits. Estimation qubit i controls U^(2^(n-1-i)), so
+    the inverse QFT is applied without the initial swaps; the measured
+    integer k (qubit 0 = least significant bit) estimates the phase as k/2^n.
+    """
+    from qiskit import QuantumCircuit
+
+    n = n_estimation_qubits
+    qc = QuantumCircuit(n + n_target_qubits, n if measure else 0)
+    estimation_qubits = list(range(n))
+    target_qubits = list(range(n, n + n_target_qubits))
+
+    # Initialize target qubit to |ψ⟩ (eigenstate of U)
+    if psi_params is None:
+        qc.x(target_qubits[0])
+    else:
+        theta, phi, lam = psi_params
+        qc.u(theta, phi, lam, target_qubits[0])
+        for qubit in target_qubits[1:]:
+            qc.cx(target_qubits[0], qubit)
+
+    # controlled-U^(2^(n-1-i)) on estimation qubit i
+    qc.h(estimation_qubits)
+    for i, qubit in enumerate(estimation_qubits):
+        qc.cp(2 * np.pi * unitary_phase * 2**(n - i - 1), qubit, target_qubits[0])
+    qc.barrier()
+
+    # inverse QFT
+    for j in range(n):
+        for m in range(j):
+            qc.cp(-np.pi / 2**(j - m), m, j)
+        qc.h(j)
+
+    if measure:
+        qc.barrier()
+        qc.measure(estimation_qubits, range(n))
+    return qc
+
+
+QPE_BASIS_GATES = ("cx", "p", "h", "x", "u")
+
+
+@lru_cache(maxsize=None)
+def _aer_simulator():
+    from qiskit_aer import AerSimulator
+    return AerSimulator()
+
+
+@lru_cache(maxsize=32)
+def transpiled_qpe_circuit(n_estimation_qubits=3, n_target_qubits=1, psi_params=None, optimization_level=1):
+    """
+    (transpiled circuit, phase Parameter) of qpe_circuit in
+    QPE_BASIS_GATES, built and transpiled once per configuration. psi_params
+    must be hashable (a tuple) for the cache.
+    """
+    from qiskit import transpile
+    from qiskit.circuit import Parameter
+
+    phase = Parameter("phase")
+    qc = qpe_circuit(phase, psi_params, n_estimation_qubits, n_target_qubits)
+    # Aer ignores parameter_binds on a parametrised cp, so cp is lowered to p + cx
+    return transpile(qc, basis_gates=QPE_BASIS_GATES, optimization_level=optimization_level), phase
+
+
+def qpe_probabilities(phases, n_estimation_qubits=3, psi_params=None):
+    """
+    Exact outcome distribution of qpe_circuit, shape (n_phases, 2^n), in
+    closed form: for the eigenphase φ the amplitude of k is
+    Σ_x e^(2πi x (φ - k/2^n)) / 2^n, one FFT per phase. The |0⟩ part of a
+    U3 target (weight cos²(θ/2)) has phase 0 and always gives k = 0.
+    """
+    phases = np.atleast_1d(np.asarray(phases, dtype=float))
+    N = 1 << n_estimation_qubits
+    amplitudes = np.fft.fft(np.exp(2j * np.pi * np.outer(phases, np.arange(N))), axis=1) / N
+    p = np.abs(amplitudes) ** 2
+    if psi_params is not None:
+        weight = np.sin(psi_params[0] / 2) ** 2
+        p *= weight
+        p[:, 0] += 1 - weight
+    return p
+
+
+def phases_from_rho(rho, element=(1, 0)):
+    """Phase in [0, 1) of one coherence of (..., 3, 3) density matrices, in turns."""
+    rho = np.asarray(rho)
+    return np.mod(np.angle(rho[..., element[0], element[1]]) / (2 * np.pi), 1.0)
+
+
+class PhaseEstimator:
+    """
+    Batched QPE of many phases with one circuit configuration.
+
+    method="exact" uses qpe_probabilities (numpy only, no qiskit);
+    method="aer" binds the phases into the cached transpiled_qpe_circuit
+    and runs them as parameter_binds of one AerSimulator job per batch_size
+    phases. "auto" is exact up to max_exact_qubits estimation qubits.
+    Both methods work through batch_size phases at a time, so the exact
+    method's (batch_size, 2^n) complex amplitudes bound its working memory
+    beyond the returned array.
+
+    With shots=None the exact method returns the probabilities themselves;
+    otherwise counts are sampled, multinomially from the exact distribution
+    or by the simulator.
+    """
+
+    def __init__(
+        self,
+        n_estimation_qubits=3,
+        n_target_qubits=1,
+        psi_params=None,          # U3 angles of the target state, None → |1⟩
+        shots=1024,               # None → exact probabilities
+        method="auto",            # "auto", "exact" or "aer"
+        max_exact_qubits=10,      # "auto" switches to aer above this
+        batch_size=4096,          # phases per simulator job / exact block
+        seed=None
+    ):
+        if method not in ("auto", "exact", "aer"):
+            raise ValueError(f"unknown method {method!r}")
+        if method == "auto":
+            method = "exact" if n_estimation_qubits <= max_exact_qubits else "aer"
+        if method == "aer" and shots is None:
+            raise ValueError("the aer method needs a number of shots")
+        self.n_estimation_qubits = n_estimation_qubits
+        self.n_target_qubits = n_target_qubits
+        self.psi_params = None if psi_params is None else tuple(float(v) for v in psi_params)
+        self.shots = shots
+        self.method = method
+        self.batch_size = batch_size
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def _aer_counts(self, phases):
+        circuit, phase = transpiled_qpe_circuit(self.n_estimation_qubits, self.n_target_qubits, self.psi_params)
+        counts = np.zeros((len(phases), 1 << self.n_estimation_qubits), dtype=np.int64)
+        for start in range(0, len(phases), self.batch_size):
+            batch = phases[start:start + self.batch_size]
+            result = _aer_simulator().run(
+                circuit, parameter_binds=[{phase: batch.tolist()}],
+                shots=self.shots, seed_simulator=self.seed
+            ).result()
+            for i in range(len(batch)):
+                for bits, c in result.get_counts(i).items():
+                    counts[start + i, int(bits, 2)] = c
+        return counts
+
+    def _exact_probabilities(self, phases):
+        """qpe_probabilities of phases, batch_size phases at a time."""
+        p = np.empty((len(phases), 1 << self.n_estimation_qubits))
+        for start in range(0, len(phases), self.batch_size):
+            p[start:start + self.batch_size] = qpe_probabilities(
+                phases[start:start + self.batch_size], self.n_estimation_qubits, self.psi_params)
+        return p
+
+    def counts(self, phases):
+        """Outcome counts, shape (n_phases, 2^n)."""
+        phases = np.atleast_1d(np.asarray(phases, dtype=float))
+        if self.shots is None:
+            raise ValueError("counts need a number of shots")
+        if self.method == "aer":
+            return self._aer_counts(phases)
+        counts = np.empty((len(phases), 1 << self.n_estimation_qubits), dtype=np.int64)
+        for start in range(0, len(phases), self.batch_size):
+            p = self._exact_probabilities(phases[start:start + self.batch_size])
+            counts[start:start + self.batch_size] = self.rng.multinomial(
+                self.shots, p / p.sum(axis=1, keepdims=True))
+        return counts
+
+    def probabilities(self, phases):
+        """Outcome distribution (exact, or shot frequencies), shape (n_phases, 2^n)."""
+        if self.shots is None:
+            return self._exact_probabilities(np.atleast_1d(np.asarray(phases, dtype=float)))
+        return self.counts(phases) / self.shots
+
+    def estimate(self, phases):
+        """Most likely phase k/2^n for every phase."""
+        return self.probabilities(phases).argmax(axis=1) / (1 << self.n_estimation_qubits)
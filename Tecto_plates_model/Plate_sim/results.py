@@ -0,0 +1,293 @@
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+from .surface import BurstMapTimes, SparseSnapshots
+
+RESULTS_FORMAT = 1
+RESULTS_HEADER_FILE = "results.json"
+RESULTS_CHUNK_BYTES = 8 << 20   # target uncompressed size of one chunk
+
+
+def _code_version():
+    """
+    Versions of the code writing a results directory: Plate_sim, the git
+    revision of its checkout (None outside one) and whether it had
+    uncommitted changes, python, numpy and pandas.
+    """
+    from . import __version__
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=package_dir, capture_output=True,
+                                  text=True, check=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    revision = git("rev-parse", "HEAD")
+    status = git("status", "--porcelain", "--untracked-files=no", "--", ".") if revision else None
+    return {
+        "plate_sim": __version__,
+        "git_revision": revision,
+        "git_dirty": None if status is None else bool(status),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def _chunk_shape(shape, itemsize, chunk_bytes):
+    """
+    Chunk sizes along the first two axes (time, then sensors or map rows)
+    so that one chunk holds about chunk_bytes; the other axes are whole.
+    """
+    if len(shape) == 1:
+        return (max(1, chunk_bytes // itemsize),)
+    row_bytes = itemsize * int(np.prod(shape[2:], dtype=np.int64))
+    rows = max(1, min(shape[1], chunk_bytes // max(row_bytes, 1)))
+    steps = max(1, chunk_bytes // max(rows * row_bytes, 1))
+    return (steps, rows)
+
+
+def _time_blocks(values, steps):
+    """(start, block) over the time axis; SparseSnapshots are densified block by block."""
+    if isinstance(values, SparseSnapshots):
+        frames = values.frames()
+        for start in range(0, len(values), steps):
+            yield start, np.stack([next(frames) for _ in range(min(steps, len(values) - start))])
+    else:
+        for start in range(0, len(values), steps):
+            yield start, np.asarray(values[start:start + steps])
+
+
+def _write_chunked(out_dir, name, values, shape, dtype, chunk_bytes, compress):
+    """Write values as chunk files under out_dir/name; returns the header entry."""
+    dtype = np.dtype(dtype)
+    chunks = _chunk_shape(shape, dtype.itemsize, chunk_bytes)
+    os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+    rows = chunks[1] if len(chunks) > 1 else None
+    for start, block in _time_blocks(values, chunks[0]):
+        block = block.astype(dtype, copy=False)
+        row_starts = range(0, shape[1], rows) if rows else [None]
+        for row in row_starts:
+            part = block if row is None else block[:, row:row + rows]
+            chunk = ChunkedArray.chunk_name(start // chunks[0], None if row is None else row // rows)
+            stem = os.path.join(out_dir, name, chunk)
+            if compress:
+                np.savez_compressed(stem + ".npz", data=part)
+            else:
+                np.save(stem + ".npy", np.ascontiguousarray(part))
+    return {"shape": list(shape), "dtype": dtype.str, "chunks": list(chunks), "compressed": compress}
+
+
+class ChunkedArray:
+    """
+    Read-only array stored as chunk files (see save_simulation_results),
+    chunked along its first one or two axes. Indexing with ints, slices or
+    index arrays on those axes only reads the chunks it touches; further
+    indices are applied to the result, and ... expands as in numpy.
+    np.newaxis is not supported. Uncompressed chunks are memory-mapped.
+    """
+
+    def __init__(self, path, name, entry):
+        self.path = os.path.join(path, name)
+        self.shape = tuple(entry["shape"])
+        self.dtype = np.dtype(entry["dtype"])
+        self.chunks = tuple(entry["chunks"])
+        self.compressed = entry["compressed"]
+
+    @staticmethod
+    def chunk_name(i, j=None):
+        return f"{i:06d}" if j is None else f"{i:06d}_{j:06d}"
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _chunk(self, i, j=None):
+        stem = os.path.join(self.path, self.chunk_name(i, j))
+        if self.compressed:
+            with np.load(stem + ".npz") as data:
+                return data["data"]
+        return np.load(stem + ".npy", mmap_mode="r")
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        if any(k is None for k in key):
+            raise IndexError("ChunkedArray does not support np.newaxis")
+        n_ellipsis = sum(k is Ellipsis for k in key)
+        if n_ellipsis > 1:
+            raise IndexError("an index can only have a single ellipsis ('...')")
+        if len(key) - n_ellipsis > self.ndim:
+            raise IndexError(f"too many indices: array is {self.ndim}-dimensional, "
+                             f"but {len(key) - n_ellipsis} were indexed")
+        if n_ellipsis:
+            at = next(i for i, k in enumerate(key) if k is Ellipsis)
+            key = key[:at] + (slice(None),) * (self.ndim - len(key) + 1) + key[at + 1:]
+        n_chunked = len(self.chunks)
+        idx = [np.arange(self.shape[a])[key[a]] if a < len(key) else np.arange(self.shape[a])
+               for a in range(n_chunked)]
+        scalar = [i.ndim == 0 for i in idx]
+        idx = [np.atleast_1d(i) for i in idx]
+
+        out = np.empty(tuple(len(i) for i in idx) + self.shape[n_chunked:], dtype=self.dtype)
+        block0 = idx[0] // self.chunks[0]
+        for b0 in np.unique(block0):
+            sel0 = np.flatnonzero(block0 == b0)
+            local0 = idx[0][sel0] - b0 * self.chunks[0]
+            if n_chunked == 1:
+                out[sel0] = self._chunk(b0)[local0]
+                continue
+            block1 = idx[1] // self.chunks[1]
+            for b1 in np.unique(block1):
+                sel1 = np.flatnonzero(block1 == b1)
+                local1 = idx[1][sel1] - b1 * self.chunks[1]
+                out[np.ix_(sel0, sel1)] = self._chunk(b0, b1)[np.ix_(local0, local1)]
+
+        out = out[tuple(0 if s else slice(None) for s in scalar)]
+        if len(key) > n_chunked:
+            out = out[(slice(None),) * scalar.count(False) + key[n_chunked:]]
+        return out
+
+    def read(self):
+        """The whole array."""
+        return self[:]
+
+
+def save_simulation_results(
+    path,
+    outputs,                    # (tectonic_emissions_df, burst_map_times, measurement_map_times, ground_accumulation_times)
+    metadata=None,              # JSON-serialisable run parameters, see below
+    compress=True,              # zlib chunks; False → .npy chunks that are memory-mapped on load
+    map_dtype=None,             # e.g. np.float32 for the burst and ground maps
+    chunk_bytes=RESULTS_CHUNK_BYTES
+):
+    """
+    Write the four outputs of a full simulation to directory path as typed,
+    chunked arrays plus a JSON header, to be opened with SimulationResults.
+
+    Burst maps may be BurstMapTimes, SparseSnapshots or arrays; sparse
+    snapshots are densified one chunk at a time, so memory stays bounded.
+    The header is written last: a directory without one is an interrupted
+    save.
+
+    The header records the code that wrote it under "code" (Plate_sim
+    version, git revision and dirty flag, python/numpy/pandas versions).
+    The run parameters cannot be recovered from the outputs, so callers
+    are expected to pass them as metadata: the keyword arguments of the
+    simulation call (hole_burst_threshold, gamma_conversion,
+    surface_diffusion_sigma, altitude_attraction_strength, v_upward,
+    total_time_yr, dt_yr, seed, surface_eps, ...) and whatever identifies
+    the terrain, source and sensor layout and measurement_function used.
+    """
+    tectonic_emissions_df, burst_map_times, measurement_map_times, ground_accumulation_times = outputs
+    os.makedirs(path, exist_ok=True)
+    header_path = os.path.join(path, RESULTS_HEADER_FILE)
+    if os.path.exists(header_path):
+        os.remove(header_path)
+
+    if isinstance(burst_map_times, BurstMapTimes):
+        burst_map_times = burst_map_times.energies
+    measurement_map_times = np.asarray(measurement_map_times)
+
+    arrays = {}
+    for column in tectonic_emissions_df.columns:
+        values = tectonic_emissions_df[column].to_numpy()
+        arrays[f"emissions/{column}"] = _write_chunked(
+            path, f"emissions/{column}", values, values.shape, values.dtype, chunk_bytes, compress)
+    arrays["burst_map"] = _write_chunked(
+        path, "burst_map", burst_map_times, tuple(burst_map_times.shape), map_dtype or np.float64, chunk_bytes, compress)
+    arrays["measurement_map"] = _write_chunked(
+        path, "measurement_map", measurement_map_times, measurement_map_times.shape,
+        measurement_map_times.dtype, chunk_bytes, compress)
+    arrays["ground_accumulation"] = _write_chunked(
+        path, "ground_accumulation", ground_accumulation_times, tuple(ground_accumulation_times.shape),
+        map_dtype or np.float64, chunk_bytes, compress)
+
+    header = {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "code": _code_version(),
+        "n_steps": len(tectonic_emissions_df),
+        "emission_columns": list(tectonic_emissions_df.columns),
+        "arrays": arrays,
+        "metadata": metadata or {},
+    }
+    with open(header_path, "w") as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+class SimulationResults:
+    """
+    Lazy view of a directory written by save_simulation_results. Nothing is
+    read until an output is indexed: results.ground_accumulation[4000] or
+    results.measurement(sensors=2) only load the chunks holding that step
+    or sensor. Pickling only sends the path, so results can be handed to
+    process-pool workers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, RESULTS_HEADER_FILE)) as f:
+            self.header = json.load(f)
+        if self.header["format"] != RESULTS_FORMAT:
+            raise ValueError(f"{path} has results format {self.header['format']}, expected {RESULTS_FORMAT}")
+        self.metadata = self.header["metadata"]
+        self.code = self.header.get("code", {})
+        self.n_steps = self.header["n_steps"]
+        arrays = self.header["arrays"]
+        self.emission_columns = {
+            column: ChunkedArray(path, f"emissions/{column}", arrays[f"emissions/{column}"])
+            for column in self.header["emission_columns"]
+        }
+        self.burst_map_times = ChunkedArray(path, "burst_map", arrays["burst_map"])
+        self.measurement_map_times = ChunkedArray(path, "measurement_map", arrays["measurement_map"])
+        self.ground_accumulation = ChunkedArray(path, "ground_accumulation", arrays["ground_accumulation"])
+
+    def __reduce__(self):
+        return (SimulationResults, (self.path,))
+
+    def __len__(self):
+        return self.n_steps
+
+    def tectonic_emissions(self, start=None, stop=None):
+        """tectonic_emissions_df rows start:stop."""
+        steps = slice(start, stop)
+        return pd.DataFrame(
+            {column: values[steps] for column, values in self.emission_columns.items()},
+            index=pd.RangeIndex(*steps.indices(self.n_steps)),
+        )
+
+    def burst_map(self, start=None, stop=None):
+        """BurstMapTimes of steps start:stop."""
+        return BurstMapTimes(self.burst_map_times[start:stop])
+
+    def measurement(self, start=None, stop=None, sensors=None):
+        """Density matrices of steps start:stop, for all sensors or the given ones."""
+        if sensors is None:
+            return self.measurement_map_times[start:stop]
+        return self.measurement_map_times[start:stop, sensors]
+
+    def ground(self, start=None, stop=None):
+        """Ground accumulation maps of steps start:stop."""
+        return self.ground_accumulation[start:stop]
+
+    def outputs(self, start=None, stop=None):
+        """The four simulation outputs of steps start:stop, as the full simulations return them."""
+        return (
+            self.tectonic_emissions(start, stop),
+            self.burst_map(start, stop),
+            self.measurement(start, stop),
+            self.ground(start, stop),
+        )
@@ -0,0 +1,260 @@
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+import rydiqule as rq
+from rydiqule.solvers import solve_steady_state
+from rydiqule.sensor_utils import convert_dm_to_complex
+
+
+def fmt_B(B): return f"{B*1e6:.0f} µT" if B < 1e-3 else f"{B*1e3:.1f} mT"
+
+MU_B_OVER_HBAR = 1.399_624_60e6 * 2 * np.pi   # rad s⁻¹ T⁻¹  (CODATA 2018)
+
+
+def _rydberg_ladder_sensor(
+        B_T,
+        mF_e, mF_r, gF_e, gF_r,
+        probe_rabi, coupling_rabi, gamma_ge, gamma_er
+    ):
+    """
+    3-level ladder {|g>,|e>,|r>} with lasers tuned to the zero-field
+    transition. B_T is a scalar, or a 1D array scanned as one zipped axis.
+    """
+    # Zeeman shifts (rad s⁻¹)
+    δe =  MU_B_OVER_HBAR * gF_e * mF_e * B_T
+    δr =  MU_B_OVER_HBAR * gF_r * mF_r * B_T
+
+    # -----------------------------------------------------------------------
+    # Build the sensor
+    s = rq.Sensor(3)                           # |0>=|g>, |1>=|e>, |2>=|r|
+    Γ = np.zeros((3, 3))
+    Γ[1, 0] = gamma_ge
+    Γ[2, 1] = gamma_er
+    s.set_gamma_matrix(Γ)
+
+    # Optional homogeneous dephasing (same for every off-diag element)
+    #if extra_dephasing:
+    #    pairs = [(i, j) for i in range(3) for j in range(3) if i != j]
+    #    s.add_decoherence_group(pairs, extra_dephasing)
+
+    # -----------------------------------------------------------------------
+    # Lasers remain tuned to ZERO-FIELD transition
+    # → detunings equal the (negative) Zeeman shifts
+    s.add_coupling(                       # probe |g> ↔ |e>
+        states        = (0, 1),
+        rabi_frequency= probe_rabi,
+        detuning      = -δe
+    )
+    s.add_coupling(                       # coupling |e> ↔ |r>
+        states        = (1, 2),
+        rabi_frequency= coupling_rabi,
+        detuning      = -(δr - δe)
+    )
+    if np.ndim(B_T) > 0:
+        s.zip_parameters({(0, 1): "detuning", (1, 2): "detuning"})
+    return s
+
+
+# ---------------------------------------------------------------------------
+# CORE FUNCTION
+# ---------------------------------------------------------------------------
+def rydberg_dm_fixed_lasers(
+        B_T,
+        mF_g=0, mF_e=+1, mF_r=+1,
+        gF_e=0.50, gF_r=0.50,
+        probe_rabi=2*np.pi*1e5,      # 100 kHz
+        coupling_rabi=2*np.pi*3e5,   # 300 kHz
+        gamma_ge=2*np.pi*5e4,        # 50 kHz   (narrowed linewidth)
+        gamma_er=2*np.pi*1e4,        # 10 kHz
+        extra_dephasing=2*np.pi*1e4  # homogeneous decoherence 10 kHz
+    ):
+    """
+    Steady-state density matrix ρ(B) for a 3-level ladder {|g>,|e>,|r>}.
+    All rates in rad s⁻¹; B in Tesla.
+
+    An array of fields is solved in one batched call (rydberg_dm_scan) and
+    returns B_T.shape + (3, 3), which makes this function a batched
+    measurement_function (see measure_sensor_fields).
+    """
+    if np.ndim(B_T) > 0:
+        rho = rydberg_dm_scan(
+            np.ravel(B_T), mF_g, mF_e, mF_r, gF_e, gF_r,
+            probe_rabi, coupling_rabi, gamma_ge, gamma_er, extra_dephasing
+        )
+        return rho.reshape(np.shape(B_T) + (3, 3))
+
+    s = _rydberg_ladder_sensor(
+        B_T, mF_e, mF_r, gF_e, gF_r,
+        probe_rabi, coupling_rabi, gamma_ge, gamma_er
+    )
+    sol = solve_steady_state(s)
+    ρ = convert_dm_to_complex(sol.rho).reshape(3, 3)
+    return ρ
+
+
+def rydberg_dm_scan(
+        B_T,
+        mF_g=0, mF_e=+1, mF_r=+1,
+        gF_e=0.50, gF_r=0.50,
+        probe_rabi=2*np.pi*1e5,
+        coupling_rabi=2*np.pi*3e5,
+        gamma_ge=2*np.pi*5e4,
+        gamma_er=2*np.pi*1e4,
+        extra_dephasing=2*np.pi*1e4
+    ):
+    """
+    ρ(B) for a 1D array of fields in a single zipped rydiqule steady-state
+    solve. Same parameters as rydberg_dm_fixed_lasers; returns (n, 3, 3).
+    Repeated fields (e.g. the many sensors without a burst) are solved once.
+    """
+    B = np.atleast_1d(np.asarray(B_T, dtype=float))
+    if len(B) == 0:
+        return np.empty((0, 3, 3), dtype=complex)
+    B_unique, inverse = np.unique(B, return_inverse=True)
+    # a length-1 scan is not a scan for rydiqule, solve it as a scalar
+    s = _rydberg_ladder_sensor(
+        B_unique if len(B_unique) > 1 else B_unique[0], mF_e, mF_r, gF_e, gF_r,
+        probe_rabi, coupling_rabi, gamma_ge, gamma_er
+    )
+    sol = solve_steady_state(s)
+    rho = convert_dm_to_complex(sol.rho).reshape(len(B_unique), 3, 3)
+    return rho[inverse.ravel()]
+
+
+class RydbergDMTable:
+    """
+    Cached measurement model: ρ(B) pre-solved over B_range and linearly
+    interpolated at run time. Calling the table with a scalar field returns a
+    (3, 3) density matrix, so it drops in for rydberg_dm_fixed_lasers as a
+    measurement_function; arrays of fields return (..., 3, 3).
+
+    The grid starts uniform with n_initial points and every interval whose
+    midpoint interpolation misses the exact solution by more than tol (max
+    abs error over the matrix elements) is bisected, each refinement round
+    being one batched rydberg_dm_scan. Fields outside B_range are solved
+    exactly and kept in an LRU cache of cache_size entries.
+
+    With cache_path the table is loaded from that .npz file when it was built
+    with the same range, tolerance and laser parameters, and written there
+    after a build otherwise.
+    """
+
+    def __init__(
+        self,
+        B_range=(0.0, 1e-3),     # field range of the table (T)
+        tol=1e-6,                # interpolation tolerance on ρ elements
+        n_initial=33,            # points of the initial uniform grid
+        max_points=1 << 14,      # stop refining beyond this many points
+        cache_size=1024,         # off-grid exact solves kept in the LRU cache
+        cache_path=None,         # .npz file to load from / save to
+        **rydberg_params         # forwarded to rydberg_dm_scan
+    ):
+        self.B_range = (float(B_range[0]), float(B_range[1]))
+        self.tol = tol
+        self.cache_size = cache_size
+        self.rydberg_params = rydberg_params
+        self._exact_cache = OrderedDict()
+
+        if cache_path is not None and os.path.exists(cache_path) and self._load(cache_path):
+            return
+        self.B_grid, self.rho_grid = self._build(n_initial, max_points)
+        if cache_path is not None:
+            self.save(cache_path)
+
+    def _build(self, n_initial, max_points):
+        B = np.linspace(*self.B_range, max(n_initial, 2))
+        rho = rydberg_dm_scan(B, **self.rydberg_params)
+        to_check = np.ones(len(B) - 1, dtype=bool)
+
+        while to_check.any() and len(B) < max_points:
+            left = np.flatnonzero(to_check)
+            mid = 0.5 * (B[left] + B[left + 1])
+            rho_mid = rydberg_dm_scan(mid, **self.rydberg_params)
+            err = np.abs(rho_mid - 0.5 * (rho[left] + rho[left + 1])).max(axis=(1, 2))
+
+            # insert every solved midpoint; only children of failed intervals are rechecked
+            B_new = np.concatenate([B, mid])
+            rho_new = np.concatenate([rho, rho_mid])
+            check_new = np.zeros(len(B_new), dtype=bool)
+            check_new[left] = err > self.tol            # left child
+            check_new[len(B) + np.arange(len(mid))] = err > self.tol   # right child
+            order = np.argsort(B_new, kind="stable")
+            B, rho, to_check = B_new[order], rho_new[order], check_new[order][:-1]
+
+        return B, rho
+
+    def _exact(self, B_values):
+        """Exact ρ for off-grid fields through the LRU cache."""
+        missing = [b for b in dict.fromkeys(B_values) if b not in self._exact_cache]
+        if missing:
+            for b, rho in zip(missing, rydberg_dm_scan(missing, **self.rydberg_params)):
+                self._exact_cache[b] = rho
+        out = np.empty((len(B_values), 3, 3), dtype=complex)
+        for i, b in enumerate(B_values):
+            out[i] = self._exact_cache[b]
+            self._exact_cache.move_to_end(b)
+        while len(self._exact_cache) > self.cache_size:
+            self._exact_cache.popitem(last=False)
+        return out
+
+    def __call__(self, B_T):
+        B = np.asarray(B_T, dtype=float)
+        flat = B.ravel()
+        out = np.empty((len(flat), 3, 3), dtype=complex)
+
+        inside = (flat >= self.B_range[0]) & (flat <= self.B_range[1])
+        x = flat[inside]
+        idx = np.clip(np.searchsorted(self.B_grid, x, side="right") - 1, 0, len(self.B_grid) - 2)
+        w = ((x - self.B_grid[idx]) / (self.B_grid[idx + 1] - self.B_grid[idx]))[:, None, None]
+        out[inside] = (1 - w) * self.rho_grid[idx] + w * self.rho_grid[idx + 1]
+
+        if not inside.all():
+            out[~inside] = self._exact(flat[~inside].tolist())
+        return out.reshape(B.shape + (3, 3))
+
+    def _metadata(self):
+        return json.dumps({
+            "B_range": self.B_range,
+            "tol": self.tol,
+            "rydberg_params": {k: float(v) for k, v in sorted(self.rydberg_params.items())},
+        })
+
+    def save(self, path):
+        """Write the pre-solved grid to a .npz file."""
+        np.savez_compressed(path, B_grid=self.B_grid, rho_grid=self.rho_grid,
+                            metadata=np.array(self._metadata()))
+
+    def _load(self, path):
+        with np.load(path) as data:
+            if str(data["metadata"]) != self._metadata():
+                return False
+            self.B_grid = data["B_grid"]
+            self.rho_grid = data["rho_grid"]
+        return True
+
+
+def rebuild_full_rho_from_vector(rho_vec):
+    """
+    Rebuild the full 3x3 density matrix from a reduced 8-element vector
+    assuming the missing element is rho[0,0].
+    """
+
+    # Create empty 3x3 matrix
+    rho_full = np.zeros((3,3), dtype=complex)
+
+    # Fill known elements
+    rho_full[1,0] = rho_vec[0]
+    rho_full[2,0] = rho_vec[1]
+    rho_full[0,1] = rho_vec[2]
+    rho_full[2,1] = rho_vec[3]
+    rho_full[0,2] = rho_vec[4]
+    rho_full[1,2] = rho_vec[5]
+    rho_full[1,1] = rho_vec[6]
+    rho_full[2,2] = rho_vec[7]
+
+    # Now reconstruct rho[0,0] to satisfy trace = 1
+    rho_full[0,0] = 1.0 - np.real(rho_full[1,1]) - np.real(rho_full[2,2])
+
+    return rho_full
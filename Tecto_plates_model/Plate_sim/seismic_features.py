@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# per-window features of the anomaly pipeline, in detect_anomalies' order
+FEATURE_NAMES = ("mean", "std", "min", "max", "skew", "kurt")
+
+
+def _moment_features(windows):
+    """
+    Features of a (n_windows, window) block from one pass of shifted power
+    sums. Each window is shifted by its first sample before summing, which
+    keeps the raw-moment to central-moment conversion well conditioned.
+    std/skew/kurt follow the pandas conventions (ddof=1, adjusted
+    Fisher-Pearson skewness, unbiased excess kurtosis, 0 for constant windows).
+    """
+    n = windows.shape[1]
+    shift = windows[:, :1].astype(np.float64)
+    d = windows - shift
+    d2 = d * d
+    S1 = d.sum(axis=1)
+    S2 = d2.sum(axis=1)
+    S3 = (d2 * d).sum(axis=1)
+    S4 = (d2 * d2).sum(axis=1)
+
+    mu = S1 / n
+    # sums of central powers
+    m2 = S2 - S1 * mu
+    m3 = S3 - 3 * mu * S2 + 2 * n * mu**3
+    m4 = S4 - 4 * mu * S3 + 6 * mu**2 * S2 - 3 * n * mu**4
+
+    out = np.empty((len(windows), len(FEATURE_NAMES)))
+    out[:, 0] = shift[:, 0] + mu
+    out[:, 2] = windows.min(axis=1)
+    out[:, 3] = windows.max(axis=1)
+
+    # moments within floating point error of zero are zero, as in pandas
+    max_abs = np.maximum(np.abs(out[:, 2]), np.abs(out[:, 3]))
+    eps = np.finfo(np.float64).eps
+    m2 = np.where(np.abs(m2) < (eps * max_abs) ** 2 * n, 0.0, np.maximum(m2, 0.0))
+    m3 = np.where(np.abs(m3) < (eps * max_abs) ** 3 * n, 0.0, m3)
+    m4 = np.where(np.abs(m4) < (eps * max_abs) ** 4 * n, 0.0, m4)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[:, 1] = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+        out[:, 4] = np.where(m2 == 0, 0.0, n * (n - 1) ** 0.5 / (n - 2) * m3 / m2**1.5) if n > 2 else np.nan
+        out[:, 5] = np.where(
+            m2 == 0, 0.0,
+            n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2**2) - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        ) if n > 3 else np.nan
+    return out
+
+
+def strided_windows(signal, window, step=None):
+    """
+    Zero-copy (n_windows, window) view of a 1D signal. step defaults to
+    window (non-overlapping chunks, a plain reshape); a smaller step gives
+    overlapping windows through sliding_window_view. A trailing partial
+    window is dropped, as in detect_anomalies.
+    """
+    signal = np.asarray(signal)
+    step = window if step is None else step
+    if len(signal) < window:
+        return np.empty((0, window), dtype=signal.dtype)
+    if step == window:
+        n_windows = len(signal) // window
+        return signal[:n_windows * window].reshape(n_windows, window)
+    return sliding_window_view(signal, window)[::step]
+
+
+def window_features(
+    signal,
+    window=150,                 # samples per window
+    step=None,                  # window start spacing; < window overlaps
+    block_windows=16384,        # windows processed per block (bounds memory)
+    n_workers=1                 # threads over blocks; numpy releases the GIL
+):
+    """
+    (n_windows, 6) array of FEATURE_NAMES for every window of a 1D signal.
+
+    signal can be a numpy array, a pandas Series or a memory-mapped column
+    (AcousticDataset); it is only viewed, never copied as a
+    whole. Blocks of windows are independent, so they are spread over a
+    thread pool and memory stays bounded by block_windows * window.
+    """
+    if isinstance(signal, pd.Series):
+        signal = signal.to_numpy()
+    windows = strided_windows(signal, window, step)
+    n_windows = len(windows)
+    out = np.empty((n_windows, len(FEATURE_NAMES)))
+
+    def run(start):
+        stop = min(start + block_windows, n_windows)
+        out[start:stop] = _moment_features(windows[start:stop])
+
+    starts = range(0, n_windows, block_windows)
+    if n_workers == 1:
+        for start in starts:
+            run(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(run, starts))
+    return out
+
+
+def window_features_frame(signal, window=150, step=None, **kwargs):
+    """window_features as a DataFrame with one column per feature."""
+    return pd.DataFrame(window_features(signal, window, step, **kwargs), columns=list(FEATURE_NAMES))
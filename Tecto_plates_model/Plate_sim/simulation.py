@@ -0,0 +1,677 @@
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .surface import (
+    BURST_BANDS,
+    BURST_ENERGY_KEYS,
+    BURST_J_PER_TESLA,
+    BurstMapTimes,
+    SparseSnapshots,
+    SparseSurfaceHoles,
+    SurfaceHoleAccumulator,
+    detect_ionization_bursts,
+)
+from .tiled_surface import TiledSurface
+from .tectonic import simulate_tectonic_emissions_and_seismic
+from .telemetry import NULL_METRICS
+
+
+def _default_measurement_function():
+    """rydberg_dm_fixed_lasers; rydiqule is only imported once a run needs it."""
+    from .rydberg import rydberg_dm_fixed_lasers
+    return rydberg_dm_fixed_lasers
+
+
+def _resolve_measurement(measurement_function, measurement_block_steps, legacy_call):
+    """
+    (measurement_function, measurement_block_steps) of a full simulation.
+    The default Rydberg model always goes through measure_sensor_fields, an
+    unset measurement_block_steps meaning blocks of 1 step. Caller-supplied
+    functions without measurement_block_steps keep the per-sensor
+    legacy_call, which is deprecated.
+    """
+    if measurement_function is None:
+        return _default_measurement_function(), measurement_block_steps or 1
+    if measurement_block_steps is None:
+        warnings.warn(
+            f"calling measurement_function per sensor and step as {legacy_call} is deprecated; "
+            "set measurement_block_steps to use the batched interface (see measure_sensor_fields)",
+            DeprecationWarning,
+            stacklevel=3
+        )
+    return measurement_function, measurement_block_steps
+
+
+def measure_sensor_fields(measurement_function, fields):
+    """
+    Batched measurement interface of the full simulations.
+
+    `fields` holds the field (T) seen by every sensor, shape (n_sensors,) or
+    (n_steps, n_sensors). measurement_function is called once with the
+    flattened vector and must return one density matrix per field, shape
+    (n, 3, 3); rydberg_dm_fixed_lasers and RydbergDMTable both do.
+    Returns fields.shape + (3, 3).
+    """
+    fields = np.asarray(fields, dtype=float)
+    rho = np.asarray(measurement_function(fields.ravel()))
+    return rho.reshape(fields.shape + (3, 3))
+
+
+def build_arrival_schedule(emission_times, source_times_to_surface, step_times, dt_yr):
+    """
+    Bucket every (emission, source) pair into the time step its holes reach
+    the surface, i.e. the steps with |arrival_time - step_time| < dt_yr/2.
+
+    Returns (offsets, emission_idx, source_idx): the pairs arriving at step t
+    are emission_idx[offsets[t]:offsets[t+1]] / source_idx[...], ordered by
+    emission then source like the original nested scan.
+    """
+    emission_times = np.asarray(emission_times, dtype=float)
+    step_times = np.asarray(step_times, dtype=float)
+    t_up = np.asarray(source_times_to_surface, dtype=float)
+    n_emissions, n_sources = len(emission_times), len(t_up)
+
+    arrival = emission_times[:, None] + t_up[None, :]
+    emission_idx = np.broadcast_to(np.arange(n_emissions)[:, None], arrival.shape).ravel()
+    source_idx = np.broadcast_to(np.arange(n_sources)[None, :], arrival.shape).ravel()
+    arrival = arrival.ravel()
+
+    # only the two steps bracketing an arrival can be within dt_yr/2 of it
+    upper = np.searchsorted(step_times, arrival, side="left")
+    hits_t, hits_e, hits_s = [], [], []
+    for cand in (upper - 1, upper):
+        valid = (cand >= 0) & (cand < len(step_times))
+        hit = np.zeros_like(valid)
+        hit[valid] = np.abs(arrival[valid] - step_times[cand[valid]]) < dt_yr / 2
+        hits_t.append(cand[hit])
+        hits_e.append(emission_idx[hit])
+        hits_s.append(source_idx[hit])
+
+    hits_t = np.concatenate(hits_t)
+    hits_e = np.concatenate(hits_e)
+    hits_s = np.concatenate(hits_s)
+    order = np.lexsort((hits_s, hits_e, hits_t))
+    hits_t, hits_e, hits_s = hits_t[order], hits_e[order], hits_s[order]
+
+    offsets = np.searchsorted(hits_t, np.arange(len(step_times) + 1), side="left")
+    return offsets, hits_e, hits_s
+
+
+def run_full_surface_hole_simulation_with_ionization(
+    terrain_3d_map,
+    x_coords,
+    y_coords,
+    source_positions,
+    sensor_positions,
+    measurement_function=None,     # None → rydberg_dm_fixed_lasers
+    hole_burst_threshold=1e-2,
+    gamma_conversion=1e5,
+    surface_diffusion_sigma=5,
+    altitude_attraction_strength=5,
+    v_upward=0.01,
+    total_time_yr=500,
+    dt_yr=1,
+    seed=42,
+    measurement_block_steps=None,  # batch the sensor stage over blocks of steps
+    surface_eps=None,              # None → dense maps; a float → sparse active-set surface
+    tile_shape=None,               # e.g. (512, 512) → dense surface step on a TiledSurface
+    n_workers=None,                # TiledSurface worker processes; None → os.cpu_count()
+    metrics=None                   # SimulationMetrics collecting stage timings and counters
+):
+    """
+    Full simulation using vectorised ionization bursts over the map,
+    and updating ground hole accumulation and Rydberg sensor measurements.
+
+    Every sensor sees the field E_visnir_J / BURST_J_PER_TESLA of its cell
+    and measurement_function is called through measure_sensor_fields once
+    per block of measurement_block_steps steps (1 if unset with the default
+    model). A caller-supplied measurement_function without
+    measurement_block_steps is still called per sensor and per step with
+    (burst_dict, sensor_idx, t_idx); that form is deprecated.
+
+    With tile_shape set, the emissions and burst pass of every step run on a
+    TiledSurface of that tile size over n_workers processes, with the same
+    results; the burst pass is then timed within the "diffusion" stage.
+    Tiling applies to the dense surface only.
+
+    With surface_eps set, the surface is a SparseSurfaceHoles dropping cells
+    with |holes| <= surface_eps, and the burst energies and
+    ground_accumulation_times are kept as SparseSnapshots (burst energies
+    per step, ground accumulation as per-step changes), so memory follows
+    the active area instead of nt*nx*ny. burst_map_times is a BurstMapTimes
+    in both cases.
+
+    With metrics, the time of every stage and the arrivals, bursts and
+    sensor solves of every step are recorded in that SimulationMetrics,
+    which is closed at the end of the run.
+    """
+    metrics = NULL_METRICS if metrics is None else metrics
+    if tile_shape is not None and surface_eps is not None:
+        raise ValueError("tile_shape applies to the dense surface; it cannot be combined with surface_eps")
+    if n_workers is not None and tile_shape is None:
+        raise ValueError("n_workers needs tile_shape")
+    measurement_function, measurement_block_steps = _resolve_measurement(
+        measurement_function, measurement_block_steps, "(burst_dict, sensor_idx, t_idx)")
+
+    # 1. Simulate tectonic emissions
+    surface_holes = np.zeros_like(terrain_3d_map)
+    with metrics.stage("emission_generation"):
+        tectonic_emissions_df = simulate_tectonic_emissions_and_seismic(
+            total_time_yr=total_time_yr,
+            dt_yr=dt_yr,
+            seed=seed
+        )
+    
+    times = tectonic_emissions_df["time_years"].values
+    nx, ny = terrain_3d_map.shape
+    nt = len(times)
+
+    # Initialize storage
+    if surface_eps is None:
+        ground_accumulation_times = np.zeros((nt, nx, ny))
+        burst_energy_times = np.zeros((nt, nx, ny, len(BURST_BANDS)))   # band axis as BURST_BANDS
+    else:
+        sparse_surface = SparseSurfaceHoles(
+            terrain_3d_map,
+            surface_diffusion_sigma=surface_diffusion_sigma,
+            altitude_attraction_strength=altitude_attraction_strength,
+            eps=surface_eps
+        )
+        ground_accumulation_times = SparseSnapshots((nx, ny))
+        burst_energy_times = SparseSnapshots((nx, ny), cumulative=False, cell_shape=(len(BURST_BANDS),))
+    measurement_map_times = np.full((nt, len(sensor_positions), 3, 3), np.nan, dtype=complex)  # density matrices
+
+    # Precompute time to surface for each source
+    source_times_to_surface = []
+    for (x_idx, y_idx, depth) in source_positions:
+        t_up = depth / v_upward / (365.25 * 24 * 3600)  # seconds to years
+        source_times_to_surface.append(t_up)
+
+    # Bin every (emission, source) arrival into its time step once
+    with metrics.stage("arrival_routing"):
+        arrival_offsets, arrival_emissions, arrival_sources = build_arrival_schedule(
+            times, source_times_to_surface, times, dt_yr
+        )
+    emission_Q = tectonic_emissions_df["emission_Q"].values
+    source_x = np.array([x for (x, y, depth) in source_positions], dtype=int)
+    source_y = np.array([y for (x, y, depth) in source_positions], dtype=int)
+    accumulator = SurfaceHoleAccumulator(
+        terrain_3d_map,
+        surface_diffusion_sigma=surface_diffusion_sigma,
+        altitude_attraction_strength=altitude_attraction_strength
+    )
+    visnir = BURST_ENERGY_KEYS.index("E_visnir_J")
+    sensor_x = np.array([x for (x, y) in sensor_positions], dtype=int)
+    sensor_y = np.array([y for (x, y) in sensor_positions], dtype=int)
+    sensor_cells = sensor_x * ny + sensor_y
+    sensor_fields = np.zeros((nt, len(sensor_positions)))   # field seen by each sensor (T)
+    block_start = 0
+
+    tiled = None
+    if tile_shape is not None:
+        tiled = TiledSurface(
+            terrain_3d_map,
+            tile_shape=tile_shape,
+            surface_diffusion_sigma=surface_diffusion_sigma,
+            altitude_attraction_strength=altitude_attraction_strength,
+            n_workers=n_workers
+        )
+        surface_holes = tiled.surface_holes
+
+    # Main loop over time
+    try:
+        for t_idx, current_time in enumerate(times):
+            # 2.1 Emit holes arriving at surface now
+            arriving = slice(arrival_offsets[t_idx], arrival_offsets[t_idx + 1])
+            metrics.count("arrivals", arrival_offsets[t_idx + 1] - arrival_offsets[t_idx])
+            if tiled is not None:
+                # 2.1-2.2 tile by tile; surface_holes and burst_energies are the shared arrays
+                with metrics.stage("diffusion"):
+                    n_bursts = tiled.step(
+                        source_x[arrival_sources[arriving]],
+                        source_y[arrival_sources[arriving]],
+                        emission_Q[arrival_emissions[arriving]],
+                        hole_threshold=hole_burst_threshold,
+                        gamma_conversion=gamma_conversion,
+                    )
+                metrics.count("bursts", n_bursts)
+                burst_energies = tiled.burst_energies
+
+                with metrics.stage("snapshotting"):
+                    burst_energy_times[t_idx] = burst_energies
+                sensor_energies = burst_energies[sensor_x, sensor_y]
+            elif surface_eps is None:
+                with metrics.stage("diffusion"):
+                    accumulator.add_emissions(
+                        surface_holes,
+                        source_x[arrival_sources[arriving]],
+                        source_y[arrival_sources[arriving]],
+                        emission_Q[arrival_emissions[arriving]]
+                    )
+
+                # 2.2 Burst computation over the whole map; burst cells are reset
+                with metrics.stage("burst_detection"):
+                    burst_mask, burst_energies = detect_ionization_bursts(
+                        surface_holes,
+                        hole_threshold=hole_burst_threshold,
+                        gamma_conversion=gamma_conversion,
+                    )
+                if metrics.enabled:
+                    metrics.count("bursts", burst_mask.sum())
+
+                # Save burst map at this timestep
+                with metrics.stage("snapshotting"):
+                    burst_energy_times[t_idx] = burst_energies
+                sensor_energies = burst_energies[sensor_x, sensor_y]
+            else:
+                # 2.1-2.2 on the active cells only (SparseSurfaceHoles.step, stage by stage)
+                with metrics.stage("diffusion"):
+                    touched = sparse_surface.add_emissions(
+                        source_x[arrival_sources[arriving]],
+                        source_y[arrival_sources[arriving]],
+                        emission_Q[arrival_emissions[arriving]]
+                    )
+                with metrics.stage("burst_detection"):
+                    burst_cells, burst_energies = sparse_surface.detect_bursts(
+                        hole_threshold=hole_burst_threshold,
+                        gamma_conversion=gamma_conversion,
+                    )
+                metrics.count("bursts", len(burst_cells))
+                with metrics.stage("snapshotting"):
+                    changed = np.union1d(touched, burst_cells)
+                    burst_energy_times.append(burst_cells, burst_energies)
+                    ground_accumulation_times.append(changed, sparse_surface.get(changed))
+
+                # burst cells are sorted, so sensors are looked up by searchsorted
+                sensor_energies = np.zeros((len(sensor_cells), len(BURST_BANDS)))
+                pos = np.searchsorted(burst_cells, sensor_cells)
+                hit = pos < len(burst_cells)
+                hit[hit] = burst_cells[pos[hit]] == sensor_cells[hit]
+                sensor_energies[hit] = burst_energies[pos[hit]]
+
+            # 2.3 Sensor measurements
+            if measurement_block_steps is not None:
+                sensor_fields[t_idx] = sensor_energies[:, visnir] / BURST_J_PER_TESLA
+                if t_idx + 1 - block_start >= measurement_block_steps or t_idx == nt - 1:
+                    with metrics.stage("measurement"):
+                        measurement_map_times[block_start:t_idx + 1] = measure_sensor_fields(
+                            measurement_function, sensor_fields[block_start:t_idx + 1]
+                        )
+                    metrics.count("sensor_solves", sensor_fields[block_start:t_idx + 1].size)
+                    block_start = t_idx + 1
+            else:
+                with metrics.stage("measurement"):
+                    for sensor_idx, (x_s, y_s) in enumerate(sensor_positions):
+                        burst_value = dict(zip(BURST_ENERGY_KEYS, sensor_energies[sensor_idx]))
+                        rho_ss = measurement_function(burst_value, sensor_idx, t_idx)
+                        if rho_ss is not None:
+                            measurement_map_times[t_idx, sensor_idx] = rho_ss
+                metrics.count("sensor_solves", len(sensor_positions))
+
+            # Save ground accumulation
+            if surface_eps is None:
+                with metrics.stage("snapshotting"):
+                    ground_accumulation_times[t_idx] = surface_holes
+            metrics.end_step(t_idx)
+    finally:
+        if tiled is not None:
+            tiled.close()
+
+    metrics.close()
+    return tectonic_emissions_df, BurstMapTimes(burst_energy_times), measurement_map_times, ground_accumulation_times
+
+
+STEPPER_CHECKPOINT_FILE = "checkpoint.npz"
+STEPPER_CHUNK_OUTPUTS = ("stress", "burst_energy", "measurement", "ground_accumulation")
+
+
+class SurfaceHoleStepper:
+    """
+    Resumable form of run_full_surface_hole_simulation_from_data.
+
+    The state carried between steps is surface_holes, the arrival schedule
+    (sources whose emissions reach the surface within a step; fixed for this
+    model) and the step cursor t_idx. extend(samples) only advances over the
+    new stress samples and returns their outputs, so appending data costs
+    the new steps only.
+
+    With out_dir, outputs are appended to that directory as .npy chunks of
+    at most chunk_steps steps and a checkpoint of the state is written after
+    each chunk. A stepper created on an existing out_dir resumes after the
+    last checkpointed chunk; the model parameters must match the ones the
+    run was started with (ValueError otherwise). load_outputs() reads the
+    whole run back in the format of run_full_surface_hole_simulation_from_data.
+
+    With metrics, every step is recorded in that SimulationMetrics (see
+    run_full_surface_hole_simulation_with_ionization); closing it is left
+    to the caller, as a stepper can be extended any number of times.
+
+    There is no surface_eps (sparse surface) option: the maps a stepper
+    holds are already bounded by one chunk of chunk_steps steps when it
+    writes to out_dir, and its .npy chunks and checkpoint are dense.
+
+    With tile_shape set, the surface step runs on a TiledSurface (see
+    run_full_surface_hole_simulation_with_ionization); call close(), or use
+    the stepper as a context manager, to release its shared memory and
+    worker processes.
+    """
+
+    def __init__(
+        self,
+        terrain_3d_map,
+        x_coords,
+        y_coords,
+        source_positions,
+        sensor_positions,
+        measurement_function=None,     # None → rydberg_dm_fixed_lasers
+        hole_burst_threshold=1e-2,
+        gamma_conversion=1e5,
+        surface_diffusion_sigma=5,
+        altitude_attraction_strength=5,
+        v_upward=0.01,
+        measurement_block_steps=None,  # batch the sensor stage over blocks of steps
+        out_dir=None,                  # directory for output chunks and checkpoints
+        chunk_steps=1024,              # steps per output chunk / between checkpoints
+        tile_shape=None,               # e.g. (512, 512) → surface step on a TiledSurface
+        n_workers=None,                # TiledSurface worker processes; None → os.cpu_count()
+        metrics=None                   # SimulationMetrics collecting stage timings and counters
+    ):
+        if n_workers is not None and tile_shape is None:
+            raise ValueError("n_workers needs tile_shape")
+        self.terrain_3d_map = terrain_3d_map
+        self.x_coords = x_coords
+        self.y_coords = y_coords
+        self.source_positions = [tuple(p) for p in source_positions]
+        self.sensor_positions = [tuple(p) for p in sensor_positions]
+        self.measurement_function, self.measurement_block_steps = _resolve_measurement(
+            measurement_function, measurement_block_steps, "(field)")
+        self.hole_burst_threshold = hole_burst_threshold
+        self.gamma_conversion = gamma_conversion
+        self.surface_diffusion_sigma = surface_diffusion_sigma
+        self.altitude_attraction_strength = altitude_attraction_strength
+        self.v_upward = v_upward
+        self.out_dir = out_dir
+        self.chunk_steps = chunk_steps
+        self.metrics = NULL_METRICS if metrics is None else metrics
+
+        self.accumulator = SurfaceHoleAccumulator(
+            terrain_3d_map,
+            surface_diffusion_sigma=surface_diffusion_sigma,
+            altitude_attraction_strength=altitude_attraction_strength
+        )
+        # an emission reaches the surface within the step when t_up < 1/2 yr
+        arrivals = [
+            (x_idx, y_idx)
+            for (x_idx, y_idx, depth) in self.source_positions
+            if depth / v_upward / (365.25 * 24 * 3600) < 1/2
+        ]
+        self.arrival_x = [x for x, y in arrivals]
+        self.arrival_y = [y for x, y in arrivals]
+        self.sensor_x = np.array([x for (x, y) in self.sensor_positions], dtype=int)
+        self.sensor_y = np.array([y for (x, y) in self.sensor_positions], dtype=int)
+
+        self._tiled = None
+        if tile_shape is not None:
+            self._tiled = TiledSurface(
+                terrain_3d_map,
+                tile_shape=tile_shape,
+                surface_diffusion_sigma=surface_diffusion_sigma,
+                altitude_attraction_strength=altitude_attraction_strength,
+                n_workers=n_workers
+            )
+            self.surface_holes = self._tiled.surface_holes
+        else:
+            self.surface_holes = np.zeros_like(terrain_3d_map)
+        self.t_idx = 0
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+            try:
+                self._resume()
+            except BaseException:
+                self.close()
+                raise
+
+    # -- stepping --------------------------------------------------------------
+    def _advance(self, stress, pbar=None):
+        """Run len(stress) steps from the current state; outputs of those steps."""
+        n = len(stress)
+        nx, ny = self.terrain_3d_map.shape
+        n_sensors = len(self.sensor_positions)
+        burst_energy = np.zeros((n, nx, ny, len(BURST_BANDS)))
+        measurement = np.full((n, n_sensors, 3, 3), np.nan, dtype=complex)
+        ground_accumulation = np.zeros((n, nx, ny))
+        sensor_fields = np.zeros((n, n_sensors))   # field seen by each sensor (T)
+        visnir = BURST_ENERGY_KEYS.index("E_visnir_J")
+        emission_Q = 1 - np.exp(-stress)
+        block_start = 0
+        metrics = self.metrics
+
+        for i in range(n):
+            metrics.count("arrivals", len(self.arrival_x))
+            if self._tiled is not None:
+                # emissions and burst pass tile by tile, in the shared arrays
+                with metrics.stage("diffusion"):
+                    n_bursts = self._tiled.step(
+                        self.arrival_x,
+                        self.arrival_y,
+                        [emission_Q[i]] * len(self.arrival_x),
+                        hole_threshold=self.hole_burst_threshold,
+                        gamma_conversion=self.gamma_conversion,
+                    )
+                metrics.count("bursts", n_bursts)
+                burst_energies = self._tiled.burst_energies
+            else:
+                with metrics.stage("diffusion"):
+                    self.accumulator.add_emissions(
+                        self.surface_holes,
+                        self.arrival_x,
+                        self.arrival_y,
+                        [emission_Q[i]] * len(self.arrival_x)
+                    )
+
+                # burst computation over the whole map; burst cells are reset
+                with metrics.stage("burst_detection"):
+                    burst_mask, burst_energies = detect_ionization_bursts(
+                        self.surface_holes,
+                        hole_threshold=self.hole_burst_threshold,
+                        gamma_conversion=self.gamma_conversion,
+                    )
+                if metrics.enabled:
+                    metrics.count("bursts", burst_mask.sum())
+
+            # sensor measurements
+            if self.measurement_block_steps is not None:
+                sensor_fields[i] = burst_energies[self.sensor_x, self.sensor_y, visnir] / BURST_J_PER_TESLA
+                if i + 1 - block_start >= self.measurement_block_steps or i == n - 1:
+                    with metrics.stage("measurement"):
+                        measurement[block_start:i + 1] = measure_sensor_fields(
+                            self.measurement_function, sensor_fields[block_start:i + 1]
+                        )
+                    metrics.count("sensor_solves", sensor_fields[block_start:i + 1].size)
+                    block_start = i + 1
+            else:
+                with metrics.stage("measurement"):
+                    for sensor_idx, (x_s, y_s) in enumerate(self.sensor_positions):
+                        rho_ss = self.measurement_function(burst_energies[x_s, y_s, visnir]/BURST_J_PER_TESLA)
+                        if rho_ss is not None:
+                            measurement[i, sensor_idx] = rho_ss
+                metrics.count("sensor_solves", n_sensors)
+
+            with metrics.stage("snapshotting"):
+                burst_energy[i] = burst_energies
+                ground_accumulation[i] = self.surface_holes
+            metrics.end_step(self.t_idx + i)
+            if pbar is not None:
+                pbar.update(1)
+
+        return stress, burst_energy, measurement, ground_accumulation
+
+    def extend(self, samples, progress=False):
+        """
+        Advance over new stress samples. Returns (tectonic_emissions_df,
+        burst_map_times, measurement_map_times, ground_accumulation_times)
+        of the new steps; time_years continues from the previous call.
+        """
+        stress = np.asarray(samples, dtype=float).ravel()
+        start = self.t_idx
+        step = len(stress) if self.out_dir is None else self.chunk_steps
+        chunks = []
+        from tqdm import tqdm
+        with tqdm(total=len(stress), disable=not progress) as pbar:
+            for pos in range(0, len(stress), max(step, 1)):
+                chunk = self._advance(stress[pos:pos + step], pbar)
+                if self.out_dir is not None:
+                    self._write_chunk(chunk)
+                self.t_idx += len(chunk[0])
+                if self.out_dir is not None:
+                    self.checkpoint()
+                chunks.append(chunk)
+
+        if not chunks:
+            chunks = [self._advance(stress)]
+        return self._as_outputs(start, *(np.concatenate(c) for c in zip(*chunks)))
+
+    def _as_outputs(self, start, stress, burst_energy, measurement, ground_accumulation):
+        tectonic_emissions_df = pd.DataFrame({
+            "time_years": np.arange(start, start + len(stress)),
+            "stress_Pa": stress,
+            "emission_Q": 1 - np.exp(-stress),
+            "seismic_output": 0,
+        })
+        return tectonic_emissions_df, BurstMapTimes(burst_energy), measurement, ground_accumulation
+
+    def close(self):
+        """Release the TiledSurface, if any; the stepper cannot be extended afterwards."""
+        if self._tiled is not None:
+            self._tiled.close()
+            self._tiled = None
+            self.surface_holes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- storage ---------------------------------------------------------------
+    def _metadata(self):
+        return json.dumps({
+            "shape": list(self.terrain_3d_map.shape),
+            "source_positions": [[float(v) for v in p] for p in self.source_positions],
+            "sensor_positions": [[int(v) for v in p] for p in self.sensor_positions],
+            "hole_burst_threshold": float(self.hole_burst_threshold),
+            "gamma_conversion": float(self.gamma_conversion),
+            "surface_diffusion_sigma": float(self.surface_diffusion_sigma),
+            "altitude_attraction_strength": float(self.altitude_attraction_strength),
+            "v_upward": float(self.v_upward),
+        })
+
+    def _chunk_starts(self):
+        """Start steps of the chunks in out_dir, sorted."""
+        prefix = STEPPER_CHUNK_OUTPUTS[0] + "_"
+        return sorted(
+            int(name[len(prefix):-len(".npy")])
+            for name in os.listdir(self.out_dir)
+            if name.startswith(prefix) and name.endswith(".npy")
+        )
+
+    def _write_chunk(self, chunk):
+        for name, values in zip(STEPPER_CHUNK_OUTPUTS, chunk):
+            np.save(os.path.join(self.out_dir, f"{name}_{self.t_idx:010d}.npy"), values)
+
+    def checkpoint(self):
+        """Write the state atomically; chunks up to t_idx are complete."""
+        path = os.path.join(self.out_dir, STEPPER_CHECKPOINT_FILE)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, surface_holes=self.surface_holes, t_idx=self.t_idx,
+                     metadata=np.array(self._metadata()))
+        os.replace(path + ".tmp", path)
+
+    def _resume(self):
+        path = os.path.join(self.out_dir, STEPPER_CHECKPOINT_FILE)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if str(data["metadata"]) != self._metadata():
+                    raise ValueError(f"{self.out_dir} holds a run with different parameters")
+                self.surface_holes[...] = data["surface_holes"]
+                self.t_idx = int(data["t_idx"])
+        # chunks written after the last checkpoint are redone
+        for start in self._chunk_starts():
+            if start >= self.t_idx:
+                for name in STEPPER_CHUNK_OUTPUTS:
+                    chunk_path = os.path.join(self.out_dir, f"{name}_{start:010d}.npy")
+                    if os.path.exists(chunk_path):
+                        os.remove(chunk_path)
+
+    def load_outputs(self):
+        """All outputs written to out_dir so far, as returned by extend()."""
+        starts = self._chunk_starts()
+        if not starts:
+            return self._as_outputs(0, *self._advance(np.empty(0)))
+        return self._as_outputs(0, *(
+            np.concatenate([np.load(os.path.join(self.out_dir, f"{name}_{s:010d}.npy")) for s in starts])
+            for name in STEPPER_CHUNK_OUTPUTS
+        ))
+
+
+def run_full_surface_hole_simulation_from_data(
+    terrain_3d_map,
+    x_coords,
+    y_coords,
+    big_data,
+    source_positions,
+    sensor_positions,
+    measurement_function=None,     # None → rydberg_dm_fixed_lasers
+    hole_burst_threshold=1e-2,
+    gamma_conversion=1e5,
+    surface_diffusion_sigma=5,
+    altitude_attraction_strength=5,
+    v_upward=0.01,
+    measurement_block_steps=None,  # batch the sensor stage over blocks of steps
+    tile_shape=None,               # e.g. (512, 512) → surface step on a TiledSurface
+    n_workers=None,                # TiledSurface worker processes; None → os.cpu_count()
+    metrics=None                   # SimulationMetrics collecting stage timings and counters
+):
+    """
+    Full simulation using vectorised ionization bursts over the map,
+    and updating ground hole accumulation and Rydberg sensor measurements.
+
+    Every sensor sees the field E_visnir_J / BURST_J_PER_TESLA of its cell
+    and measurement_function is called through measure_sensor_fields once
+    per block of measurement_block_steps steps (1 if unset with the default
+    model). A caller-supplied measurement_function without
+    measurement_block_steps is still called per sensor and per step with
+    the field as a scalar; that form is deprecated. tile_shape and
+    n_workers are as in run_full_surface_hole_simulation_with_ionization.
+
+    One-shot run of SurfaceHoleStepper; use the stepper directly to extend a
+    run with new data or to checkpoint it to disk. metrics is closed at the
+    end of the run. Unlike run_full_surface_hole_simulation_with_ionization
+    there is no surface_eps: use a stepper with out_dir to bound the memory
+    of long runs (see SurfaceHoleStepper).
+    """
+    stepper = SurfaceHoleStepper(
+        terrain_3d_map,
+        x_coords,
+        y_coords,
+        source_positions,
+        sensor_positions,
+        measurement_function=measurement_function,
+        hole_burst_threshold=hole_burst_threshold,
+        gamma_conversion=gamma_conversion,
+        surface_diffusion_sigma=surface_diffusion_sigma,
+        altitude_attraction_strength=altitude_attraction_strength,
+        v_upward=v_upward,
+        measurement_block_steps=measurement_block_steps,
+        tile_shape=tile_shape,
+        n_workers=n_workers,
+        metrics=metrics
+    )
+    with stepper:
+        outputs = stepper.extend(big_data, progress=True)
+    stepper.metrics.close()
+    return outputs
@@ -0,0 +1,430 @@
+import numpy as np
+from scipy.ndimage import gaussian_filter, gaussian_filter1d
+
+
+# burst energy bands, in the order used by the band axis of burst arrays
+BURST_BANDS = ("UV", "Vis-NIR", "IR")
+BURST_ENERGY_KEYS = ("E_uv_J", "E_visnir_J", "E_ir_J")
+BURST_J_PER_TESLA = 200   # Vis-NIR burst energy per unit of field seen by a sensor
+
+
+def simulate_ionization_bursts(df,
+                                hole_threshold=0.1,  # threshold of hole mass to trigger a burst (kg)
+                                gamma_conversion=1e5, # conversion J/kg
+                                energy_distribution={"UV":0.4, "Vis-NIR":0.3, "IR":0.3}):
+    """
+    Simulate ionization bursts when holes accumulate.
+    `df` is a DataFrame with an "emission_Q" column or a 1D array of
+    emissions; the running sum is a cumsum, so no row iteration is needed.
+    """
+    import pandas as pd
+
+    emissions = df["emission_Q"] if isinstance(df, pd.DataFrame) else df
+    accumulated_holes = np.cumsum(np.asarray(emissions, dtype=float))
+
+    # accumulated holes are not drained by a burst
+    E_pulse = gamma_conversion * accumulated_holes[accumulated_holes >= hole_threshold]
+    if len(E_pulse) == 0:
+        return pd.DataFrame()
+
+    # Split energy
+    return pd.DataFrame({
+        "accumulated_holes_kg": np.zeros(len(E_pulse), dtype=int),
+        "E_uv_J": energy_distribution["UV"] * E_pulse / 1e4,
+        "E_visnir_J": energy_distribution["Vis-NIR"] * E_pulse / 1e4,
+        "E_ir_J": energy_distribution["IR"] * E_pulse / 1e4,
+    })
+
+
+def detect_ionization_bursts(surface_holes,
+                             hole_threshold=0.1,
+                             gamma_conversion=1e5,
+                             energy_distribution={"UV":0.4, "Vis-NIR":0.3, "IR":0.3},
+                             reset=True):
+    """
+    Vectorised burst pass over a hole map: every cell holding at least
+    hole_threshold bursts, as simulate_ionization_bursts would for a
+    one-row series, and is reset to zero in place when reset=True.
+
+    Returns (burst_mask, burst_energies) with burst_energies of shape
+    surface_holes.shape + (3,), bands ordered as BURST_BANDS.
+    """
+    burst_mask = surface_holes >= hole_threshold
+    fractions = np.array([energy_distribution[band] for band in BURST_BANDS])
+
+    burst_energies = np.zeros(surface_holes.shape + (len(BURST_BANDS),))
+    E_pulse = gamma_conversion * surface_holes[burst_mask]
+    burst_energies[burst_mask] = E_pulse[:, None] * fractions / 1e4
+
+    if reset:
+        surface_holes[burst_mask] = 0.0
+    return burst_mask, burst_energies
+
+
+def burst_energies_to_dicts(burst_energies):
+    """Object array of {"E_uv_J", "E_visnir_J", "E_ir_J"} dicts, one per cell."""
+    burst_map = np.empty(burst_energies.shape[:-1], dtype=object)
+    for idx in np.ndindex(burst_map.shape):
+        burst_map[idx] = dict(zip(BURST_ENERGY_KEYS, burst_energies[idx]))
+    return burst_map
+
+
+class BurstMapTimes:
+    """
+    Burst energies of a full simulation, stored as one float array
+    `energies` of shape (nt, nx, ny, 3) with the band axis ordered as
+    BURST_BANDS, or as SparseSnapshots of that shape for sparse runs
+    (band() then densifies one band over all steps).
+
+    Behaves like the former (nt, nx, ny) object array of dicts: indexing a
+    single cell, e.g. burst_map_times[t_idx, ix, iy], returns the
+    {"E_uv_J", "E_visnir_J", "E_ir_J"} dict, and partial indexing returns a
+    BurstMapTimes over the selected cells. Use band() for whole-array access.
+    """
+
+    def __init__(self, energies):
+        self.energies = energies
+
+    @property
+    def shape(self):
+        return self.energies.shape[:-1]
+
+    @property
+    def ndim(self):
+        return self.energies.ndim - 1
+
+    def __len__(self):
+        return len(self.energies)
+
+    def __getitem__(self, key):
+        sub = self.energies[key]
+        if sub.ndim == 1:
+            return dict(zip(BURST_ENERGY_KEYS, sub))
+        return BurstMapTimes(sub)
+
+    def band(self, band):
+        """Energies of one band, by BURST_BANDS name or BURST_ENERGY_KEYS key."""
+        idx = BURST_BANDS.index(band) if band in BURST_BANDS else BURST_ENERGY_KEYS.index(band)
+        return self.energies[..., idx]
+
+    def to_dicts(self):
+        """Materialise the object array of dicts (slow, for legacy code only)."""
+        return burst_energies_to_dicts(self.energies)
+
+
+def update_surface_hole_accumulation(
+    surface_holes,         # 2D array: current accumulated holes map
+    terrain_map,           # 2D array: altitude map z(x,y)
+    x_idx_source,          # int: x index of emission source
+    y_idx_source,          # int: y index of emission source
+    emitted_holes,         # float: amount of holes emitted now
+    surface_diffusion_sigma=1.0,  # sigma of lateral diffusion
+    altitude_attraction_strength=0.005             # attraction to high altitude
+):
+    """
+    Update surface holes accumulation with a new emission.
+    No renormalization. True physical accumulation.
+    """
+
+    # Grid shape
+    nx, ny = surface_holes.shape
+
+    # Create a temp grid for new emitted holes
+    temp_grid = np.zeros((nx, ny))
+    temp_grid[x_idx_source, y_idx_source] += emitted_holes  # inject emission at source
+
+    # Apply Gaussian spreading
+    temp_grid = gaussian_filter(temp_grid, sigma=surface_diffusion_sigma)
+
+    # Altitude attraction
+    z_mean = np.mean(terrain_map)
+    z_normalized = terrain_map - z_mean
+    attraction = 1.0 + altitude_attraction_strength * z_normalized
+    temp_grid *= attraction
+
+    # No Renormalization: we keep total quantity physical
+
+    # Update the surface accumulation
+    surface_holes += temp_grid
+
+    return surface_holes
+
+class SurfaceHoleAccumulator:
+    """
+    Stencil version of update_surface_hole_accumulation for a fixed terrain.
+
+    The altitude attraction depends only on the terrain and the Gaussian
+    response to a point source only on surface_diffusion_sigma, so both are
+    computed once. gaussian_filter is separable, so the response to a source
+    at (x, y) is the outer product of two 1D responses (same truncation and
+    reflect boundaries as gaussian_filter), cached per index and trimmed to
+    their support. Each emission is then an in-place stamp of O(stencil)
+    cost instead of an O(nx*ny) filter pass.
+    """
+
+    def __init__(
+        self,
+        terrain_map,                      # 2D array: altitude map z(x,y)
+        surface_diffusion_sigma=1.0,      # sigma of lateral diffusion
+        altitude_attraction_strength=0.005
+    ):
+        z_normalized = terrain_map - np.mean(terrain_map)
+        self._setup(1.0 + altitude_attraction_strength * z_normalized, surface_diffusion_sigma)
+
+    def _setup(self, attraction, surface_diffusion_sigma):
+        self.shape = attraction.shape
+        self.surface_diffusion_sigma = surface_diffusion_sigma
+        self.attraction = attraction
+        self._responses = {}   # (axis, index) -> (start, 1D weights)
+
+    @classmethod
+    def from_attraction(cls, attraction, surface_diffusion_sigma=1.0):
+        """Accumulator over a precomputed attraction map (e.g. a shared-memory view)."""
+        accumulator = cls.__new__(cls)
+        accumulator._setup(attraction, surface_diffusion_sigma)
+        return accumulator
+
+    def _response(self, axis, idx):
+        """1D Gaussian response to a unit source at idx, trimmed to its support."""
+        key = (axis, idx)
+        if key not in self._responses:
+            delta = np.zeros(self.shape[axis])
+            delta[idx] = 1.0
+            r = gaussian_filter1d(delta, self.surface_diffusion_sigma, mode="reflect")
+            support = np.flatnonzero(r)
+            start, stop = support[0], support[-1] + 1
+            self._responses[key] = (start, r[start:stop])
+        return self._responses[key]
+
+    def stencil(self, x_idx_source, y_idx_source):
+        """(x slice, y slice, 2D unit stencil) of a source, attraction included."""
+        x0, rx = self._response(0, x_idx_source)
+        y0, ry = self._response(1, y_idx_source)
+        xs, ys = slice(x0, x0 + len(rx)), slice(y0, y0 + len(ry))
+        return xs, ys, np.outer(rx, ry) * self.attraction[xs, ys]
+
+    def add_emission(self, surface_holes, x_idx_source, y_idx_source, emitted_holes, region=None):
+        """
+        Stamp one emission onto surface_holes in place. With region =
+        (x0, x1, y0, y1) only the part of the stencil inside that box is
+        stamped (tiled runs).
+        """
+        xs, ys, unit = self.stencil(x_idx_source, y_idx_source)
+        if region is not None:
+            x0, x1 = max(xs.start, region[0]), min(xs.stop, region[1])
+            y0, y1 = max(ys.start, region[2]), min(ys.stop, region[3])
+            if x0 >= x1 or y0 >= y1:
+                return surface_holes
+            unit = unit[x0 - xs.start:x1 - xs.start, y0 - ys.start:y1 - ys.start]
+            xs, ys = slice(x0, x1), slice(y0, y1)
+        surface_holes[xs, ys] += emitted_holes * unit
+        return surface_holes
+
+    def add_emissions(self, surface_holes, x_idx_sources, y_idx_sources, emitted_holes, region=None):
+        """
+        Stamp a batch of emissions (e.g. all arrivals of one time step).
+        Emissions from the same source are summed first, so the cost is one
+        stamp per distinct source.
+        """
+        totals = {}
+        for x, y, q in zip(x_idx_sources, y_idx_sources, emitted_holes):
+            totals[(x, y)] = totals.get((x, y), 0.0) + q
+        for (x, y), q in totals.items():
+            self.add_emission(surface_holes, x, y, q, region)
+        return surface_holes
+
+
+class SparseSurfaceHoles:
+    """
+    Active-set form of the surface_holes map for large, mostly empty grids.
+
+    Only cells with |holes| > eps are stored, as sorted flat indices and
+    their values. Emissions are stamped with the SurfaceHoleAccumulator
+    stencils and the burst pass only looks at the active cells, so a step
+    costs O(active + stencil) instead of O(nx*ny). With eps=0 (only exact
+    zeros, e.g. reset burst cells, are dropped) the values are the ones of
+    the dense path; a positive eps, which must stay below the burst
+    threshold, also drops the far Gaussian tails.
+    """
+
+    def __init__(
+        self,
+        terrain_map,                      # 2D array: altitude map z(x,y)
+        surface_diffusion_sigma=1.0,      # sigma of lateral diffusion
+        altitude_attraction_strength=0.005,
+        eps=0.0                           # cells with |holes| <= eps are dropped
+    ):
+        self.accumulator = SurfaceHoleAccumulator(
+            terrain_map,
+            surface_diffusion_sigma=surface_diffusion_sigma,
+            altitude_attraction_strength=altitude_attraction_strength
+        )
+        self.shape = terrain_map.shape
+        self.eps = eps
+        self.index = np.empty(0, dtype=np.int64)   # sorted flat indices of active cells
+        self.values = np.empty(0)
+
+    def _stamp(self, x_idx_source, y_idx_source, emitted_holes):
+        """(flat cells, contributions) of one emission."""
+        xs, ys, unit = self.accumulator.stencil(x_idx_source, y_idx_source)
+        cells = (np.arange(xs.start, xs.stop)[:, None] * self.shape[1] + np.arange(ys.start, ys.stop)).ravel()
+        return cells, (emitted_holes * unit).ravel()
+
+    def _activate(self, cells):
+        """Insert the sorted, unique cells not yet active with value 0."""
+        pos = np.searchsorted(self.index, cells)
+        present = pos < len(self.index)
+        present[present] = self.index[pos[present]] == cells[present]
+        new = cells[~present]
+        if len(new):
+            at = np.searchsorted(self.index, new)
+            self.index = np.insert(self.index, at, new)
+            self.values = np.insert(self.values, at, 0.0)
+
+    def get(self, cells):
+        """Values at flat cells (0 for inactive cells)."""
+        cells = np.asarray(cells, dtype=np.int64)
+        if not len(self.index):
+            return np.zeros(len(cells))
+        pos = np.minimum(np.searchsorted(self.index, cells), len(self.index) - 1)
+        return np.where(self.index[pos] == cells, self.values[pos], 0.0)
+
+    def add_emissions(self, x_idx_sources, y_idx_sources, emitted_holes):
+        """Stamp a batch of emissions; returns the flat cells touched."""
+        totals = {}
+        for x, y, q in zip(x_idx_sources, y_idx_sources, emitted_holes):
+            totals[(x, y)] = totals.get((x, y), 0.0) + q
+        stamps = [self._stamp(x, y, q) for (x, y), q in totals.items()]
+        if not stamps:
+            return np.empty(0, dtype=np.int64)
+
+        touched = np.unique(np.concatenate([cells for cells, _ in stamps]))
+        self._activate(touched)
+        for cells, contribution in stamps:
+            self.values[np.searchsorted(self.index, cells)] += contribution
+        return touched
+
+    def detect_bursts(self,
+                      hole_threshold=0.1,
+                      gamma_conversion=1e5,
+                      energy_distribution={"UV":0.4, "Vis-NIR":0.3, "IR":0.3}):
+        """
+        detect_ionization_bursts over the active cells: burst cells are reset
+        and dropped. Returns (flat burst cells, (n_bursts, 3) energies).
+        """
+        burst = self.values >= hole_threshold
+        fractions = np.array([energy_distribution[band] for band in BURST_BANDS])
+        cells = self.index[burst]
+        energies = (gamma_conversion * self.values[burst])[:, None] * fractions / 1e4
+
+        self.values[burst] = 0.0
+        keep = np.abs(self.values) > self.eps
+        self.index, self.values = self.index[keep], self.values[keep]
+        return cells, energies
+
+    def step(self, x_idx_sources, y_idx_sources, emitted_holes, **burst_kwargs):
+        """
+        Emissions then burst pass. Returns (burst cells, burst energies,
+        changed cells, their new values); the last two are the snapshot delta.
+        """
+        touched = self.add_emissions(x_idx_sources, y_idx_sources, emitted_holes)
+        burst_cells, burst_energies = self.detect_bursts(**burst_kwargs)
+        changed = np.union1d(touched, burst_cells)
+        return burst_cells, burst_energies, changed, self.get(changed)
+
+    def to_dense(self):
+        surface_holes = np.zeros(self.shape)
+        surface_holes.flat[self.index] = self.values
+        return surface_holes
+
+
+class SparseSnapshots:
+    """
+    Per-step maps of a simulation stored as sparse per-step records: flat
+    cell indices and values, CSR-style, with values of shape cell_shape per
+    cell. cumulative=True stores changes (frame t = frame t-1 updated with
+    the record of step t, e.g. ground accumulation); cumulative=False stores
+    whole frames that are zero elsewhere (e.g. burst energies).
+
+    Memory follows the number of recorded cells, not nt*nx*ny. Indexing
+    frame t returns a dense array, and further indices select from it, e.g.
+    snapshots[t, ix, iy] (a single cell of a non-cumulative map is looked up
+    without densifying). A slice or ... on the time axis stacks the frames
+    it covers. Reading frames in increasing order replays each record once.
+    """
+
+    def __init__(self, shape, cumulative=True, cell_shape=()):
+        self.frame_shape = tuple(shape) + tuple(cell_shape)
+        self.cumulative = cumulative
+        self._cells = []
+        self._values = []
+        self._cursor = None   # (t, dense frame) of the last cumulative read
+
+    def append(self, cells, values):
+        self._cells.append(np.asarray(cells, dtype=np.int64))
+        self._values.append(np.asarray(values, dtype=float))
+
+    def __len__(self):
+        return len(self._cells)
+
+    @property
+    def shape(self):
+        return (len(self),) + self.frame_shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes + v.nbytes for c, v in zip(self._cells, self._values))
+
+    def _apply(self, frame, t):
+        flat = frame.reshape((-1,) + frame.shape[2:])
+        flat[self._cells[t]] = self._values[t]
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        t, rest = key[0], key[1:]
+        if t is Ellipsis:
+            t, rest = slice(None), key
+        if isinstance(t, slice):
+            frames = [self._frame(i)[rest] for i in range(len(self))[t]]
+            if not frames:
+                return np.zeros((0,) + self.frame_shape)[(slice(None),) + rest]
+            return np.stack(frames)
+        t = range(len(self))[t]
+        if not self.cumulative and len(rest) == 2 and all(isinstance(i, (int, np.integer)) for i in rest):
+            nx, ny = self.frame_shape[:2]
+            hit = np.flatnonzero(self._cells[t] == range(nx)[rest[0]] * ny + range(ny)[rest[1]])
+            if len(hit):
+                return self._values[t][hit[-1]].copy()
+            return np.zeros(self.frame_shape[2:])[()]
+        return self._frame(t)[rest]
+
+    def _frame(self, t):
+        """Dense frame t."""
+        if not self.cumulative:
+            frame = np.zeros(self.frame_shape)
+            self._apply(frame, t)
+            return frame
+
+        if self._cursor is None or self._cursor[0] > t:
+            self._cursor = (-1, np.zeros(self.frame_shape))
+        start, frame = self._cursor
+        for i in range(start + 1, t + 1):
+            self._apply(frame, i)
+        self._cursor = (t, frame)
+        return frame.copy()
+
+    def frames(self):
+        """Generator over the dense frames in time order."""
+        for t in range(len(self)):
+            yield self._frame(t)
+
+    def to_dense(self):
+        """(nt, ...) dense array; only for maps that fit in memory."""
+        out = np.empty(self.shape)
+        for t, frame in enumerate(self.frames()):
+            out[t] = frame
+        return out
@@ -0,0 +1,368 @@
+import numpy as np
+import pandas as pd
+
+
+def _stress_ladder(start, increment, n_steps):
+    """
+    Stress after 1..n_steps loading increments starting from `start`.
+    np.cumsum adds sequentially, so the values are bit-identical to
+    repeating `stress += increment` in a Python loop.
+    """
+    loads = np.full(n_steps + 1, increment)
+    loads[0] = start
+    return np.cumsum(loads)[1:]
+
+
+def _simulate_tectonic_events(
+    rng, total_steps, dt_yr, increment,
+    sigma_mean, sigma_std, sigma_residual, alpha_mean, alpha_std,
+    batch_size
+):
+    """
+    Event-driven core of simulate_tectonic_emissions.
+
+    Stress grows linearly between failures and every cycle restarts from the
+    same state (0 for the first one, sigma_residual afterwards), so the stress
+    reached after n increments is a fixed ladder. The failure step of each
+    threshold is a searchsorted on that ladder and the event times are a
+    cumsum of the cycle lengths. (sigma_c, alpha) pairs are drawn in batches
+    in the same order as the stepping loop, which keeps results identical.
+    """
+    ladders = {}   # start stress -> ladder of reachable stresses
+
+    def cycle_lengths(start, thresholds):
+        ladder = ladders.get(start)
+        # analytic estimate of the longest cycle, +2 for rounding in the ladder
+        needed = int(np.ceil((np.max(thresholds) - start) / increment)) + 2
+        needed = min(max(needed, 1), total_steps)
+        if ladder is None or (len(ladder) < needed and len(ladder) < total_steps):
+            ladder = _stress_ladder(start, increment, needed)
+            ladders[start] = ladder
+        idx = np.searchsorted(ladder, thresholds, side="left")
+        while np.any(idx == len(ladder)) and len(ladder) < total_steps:
+            # float accumulation fell short of the estimate: grow the ladder
+            ladder = _stress_ladder(start, increment, min(2 * len(ladder), total_steps))
+            ladders[start] = ladder
+            idx = np.searchsorted(ladder, thresholds, side="left")
+        # thresholds that are never reached within the run end it
+        lengths = idx + 1
+        lengths[idx == len(ladder)] = total_steps + 1
+        return lengths, ladder[np.minimum(idx, len(ladder) - 1)]
+
+    step_chunks, stress_chunks, alpha_chunks = [], [], []
+    next_step = 0      # first step of the current cycle
+    first_cycle = True
+
+    while next_step < total_steps:
+        draws = rng.normal([sigma_mean, alpha_mean], [sigma_std, alpha_std], size=(batch_size, 2))
+        sigma_c, alpha = draws[:, 0], draws[:, 1]
+
+        lengths = np.empty(batch_size, dtype=np.int64)
+        stress = np.empty(batch_size)
+        if first_cycle:
+            lengths[:1], stress[:1] = cycle_lengths(0.0, sigma_c[:1])
+            lengths[1:], stress[1:] = cycle_lengths(sigma_residual, sigma_c[1:])
+            first_cycle = False
+        else:
+            lengths[:], stress[:] = cycle_lengths(sigma_residual, sigma_c)
+
+        # failure step of each cycle: previous failure + cycle length
+        fail_steps = next_step - 1 + np.cumsum(lengths)
+        n_kept = np.searchsorted(fail_steps, total_steps, side="left")
+
+        step_chunks.append(fail_steps[:n_kept])
+        stress_chunks.append(stress[:n_kept])
+        alpha_chunks.append(alpha[:n_kept])
+
+        if n_kept < batch_size:
+            break
+        next_step = fail_steps[-1] + 1
+
+    if not step_chunks:
+        # total_steps == 0: no cycle is drawn, as the stepping loop never runs
+        step_chunks, stress_chunks, alpha_chunks = [np.empty(0, dtype=np.int64)], [np.empty(0)], [np.empty(0)]
+    steps = np.concatenate(step_chunks)
+    delta_sigma = np.concatenate(stress_chunks) - sigma_residual
+    Q = np.concatenate(alpha_chunks) * delta_sigma
+
+    return pd.DataFrame({
+        "time_years": steps * dt_yr,
+        "stress_drop_Pa": delta_sigma,
+        "emission_Q": Q,
+    })
+
+
+def simulate_tectonic_emissions(
+    total_time_yr=1_000,          # simulation span in years
+    dt_yr=0.01,                   # time step in years
+    V=1,                       # plate velocity (m/s)
+    k=5e10,                       # shear stiffness (Pa m^-1)
+    sigma_mean=50e5,              # mean failure stress (Pa)
+    sigma_std=5e3,                # std dev of failure stress (Pa)
+    sigma_residual=10e6,          # residual stress (Pa)
+    alpha_mean=2e-6,              # mean coupling (kg s^-1 Pa^-1)
+    alpha_std=0.5e-6,             # std dev of coupling
+    seed=None,                    # RNG seed for reproducibility
+    event_driven=False,           # jump from failure to failure instead of stepping
+    batch_size=4096               # (sigma_c, alpha) pairs drawn per batch in event mode
+):
+    """
+    Return DataFrame with times, stress drops and emissions.
+
+    With event_driven=True the failure steps are computed in closed form
+    (see _simulate_tectonic_events); the output is identical to the stepping
+    loop for the same seed but the cost scales with the number of events
+    instead of the number of time steps.
+    """
+    rng = np.random.default_rng(seed)
+    # convert years → seconds so V fits SI units
+    dt = dt_yr * 365.25 * 24 * 3600
+    total_steps = int(total_time_yr / dt_yr)
+
+    if event_driven and k * V * dt > 0:
+        return _simulate_tectonic_events(
+            rng, total_steps, dt_yr, k * V * dt,
+            sigma_mean, sigma_std, sigma_residual, alpha_mean, alpha_std,
+            batch_size
+        )
+
+    # state variables
+    slip = 0.0                     # cumulative relaxed slip (m)
+    sigma_c = rng.normal(sigma_mean, sigma_std)   # next threshold
+    alpha = rng.normal(alpha_mean, alpha_std)     # next α
+    stress = 0.0
+
+    records = []  # store events
+
+    for step in range(total_steps):
+        # advance time and stress
+        stress += k * V * dt        # Δσ = k V Δt  (because slip is fixed between events)
+
+        # check for failure
+        if stress >= sigma_c:
+            delta_sigma = stress - sigma_residual
+            Q = alpha * delta_sigma
+
+            t_years = step * dt_yr
+            records.append((t_years, delta_sigma, Q))
+
+            # reset state for next cycle
+            slip += delta_sigma / k          # equivalent relaxed slip
+            stress = sigma_residual
+            sigma_c = rng.normal(sigma_mean, sigma_std)
+            alpha = rng.normal(alpha_mean, alpha_std)
+
+    return pd.DataFrame(records, columns=["time_years", "stress_drop_Pa", "emission_Q"])
+"""
+def simulate_tectonic_emissions_and_seismic(
+    total_time_yr=1_000,
+    dt_yr=0.01,
+    V = 1.2e-9,              # m/s (≈ 3.8 cm/year relative motion)
+    k = 5e10,                # Pa/m (keep it)
+    sigma_mean = 80e6,       # 80 MPa mean friction stress
+    sigma_std = 10e6,        # 10 MPa std dev
+    sigma_residual = 0,   # 10 MPa residual stress
+    alpha_mean = 2e-6,       # (1/s) healing rate
+    alpha_std = 0.5e-6,      # (1/s) std
+    stress_drop_seismic_threshold = 20e3,  # 20 MPa needed for earthquakes
+    beta_seismic = 1e-10,    # scaling of seismic energy
+    seed=None
+    ):
+    #Return DataFrame with time, stress drop, emission Q, seismic output.
+    rng = np.random.default_rng(seed)
+    dt = dt_yr * 365.25 * 24 * 3600  # time step in seconds
+    total_steps = int(total_time_yr / dt_yr)
+    print(total_steps)
+
+    # state variables
+    slip = 0.0
+    sigma_c = rng.normal(sigma_mean, sigma_std)
+    alpha = rng.normal(alpha_mean, alpha_std)
+    stress = 0.0
+
+    records = []
+
+    for step in range(total_steps):
+        stress += k * V * dt  # stress accumulation
+
+        if stress >= sigma_c:
+            delta_sigma = stress - sigma_residual
+            Q = alpha * delta_sigma
+
+            # Check if seismic event occurs
+            if delta_sigma >= stress_drop_seismic_threshold:
+                seismic_output = beta_seismic * (delta_sigma ** 2)
+            else:
+                seismic_output = 0.0
+
+            t_years = step * dt_yr
+            records.append((t_years, delta_sigma, Q, seismic_output))
+
+            # reset for next cycle
+            slip += delta_sigma / k
+            stress = sigma_residual
+            sigma_c = rng.normal(sigma_mean, sigma_std)
+            alpha = rng.normal(alpha_mean, alpha_std)
+
+    return pd.DataFrame(records, columns=["time_years", "stress_drop_Pa", "emission_Q", "seismic_output"])
+"""
+def _seismic_cycle(start, increment, threshold, max_steps):
+    """
+    Stress ladder of one loading cycle and its length in steps, searched
+    over at most max_steps. The length is None when the threshold is not
+    reached within max_steps.
+    """
+    ladder = _stress_ladder(start, increment, max_steps)
+    idx = np.searchsorted(ladder, threshold, side="left")
+    if idx == len(ladder):
+        return ladder, None
+    return ladder[:idx + 1], idx + 1
+
+
+def _seismic_kernel_chunks(
+    rng, total_steps, dt_yr, dt, increment,
+    sigma_residual, alpha_mean, alpha_std,
+    stress_drop_seismic_threshold, beta_seismic,
+    chunk_steps, alpha
+):
+    """
+    Array kernel of simulate_tectonic_emissions_and_seismic, yielding
+    DataFrames of at most chunk_steps rows.
+
+    The threshold is fixed, so the stress is a sawtooth: a first cycle
+    loaded from 0 and then identical cycles loaded from sigma_residual.
+    Within a chunk the stress is continued from the carried value with
+    _stress_ladder up to the next reset; cycles of at most chunk_steps are
+    built once and tiled. Every ladder holds at most chunk_steps values,
+    so memory is O(chunk_steps) whatever the cycle length. alpha is drawn
+    per chunk in the same order as the stepping loop.
+    """
+    threshold = stress_drop_seismic_threshold
+    cycle_ladder, cycle_len = _seismic_cycle(
+        sigma_residual, increment, threshold, min(chunk_steps, total_steps))
+    carried = 0.0         # stress after the previous step
+    reloaded = False      # a reset happened, so the current cycle started at sigma_residual
+    cycle_pos = 0         # steps since that reset
+
+    for start in range(0, total_steps, chunk_steps):
+        steps = np.arange(start, min(start + chunk_steps, total_steps))
+        n = len(steps)
+
+        # alpha used at each step: the carried one, then this chunk's draws
+        alphas = np.empty(n)
+        alphas[0] = alpha
+        draws = rng.normal(alpha_mean, alpha_std, size=n)
+        alphas[1:] = draws[:-1]
+        alpha = draws[-1]
+
+        stress = np.empty(n)
+        reset = np.zeros(n, dtype=bool)
+        pos = 0
+        while pos < n:
+            if reloaded and cycle_len is not None:
+                # short cycles: tile the precomputed one over the rest of the chunk
+                phase = (cycle_pos + np.arange(n - pos)) % cycle_len
+                stress[pos:] = cycle_ladder[phase]
+                reset[pos:] = phase == cycle_len - 1
+                cycle_pos = (cycle_pos + n - pos) % cycle_len
+                break
+            segment = _stress_ladder(carried, increment, n - pos)
+            idx = np.searchsorted(segment, threshold, side="left")
+            if idx == len(segment):
+                stress[pos:] = segment
+                carried = segment[-1]
+                cycle_pos += n - pos
+                break
+            stress[pos:pos + idx + 1] = segment[:idx + 1]
+            reset[pos + idx] = True
+            pos += idx + 1
+            carried, reloaded, cycle_pos = sigma_residual, True, 0
+
+        Q = np.empty(n)
+        np.multiply(alphas, stress, out=Q)
+        Q *= dt
+        seismic = np.zeros(n)
+        np.multiply(beta_seismic, stress, out=seismic, where=reset)
+        stress[reset] = sigma_residual
+
+        yield pd.DataFrame({
+            "time_years": steps * dt_yr,
+            "stress_Pa": stress,
+            "emission_Q": Q,
+            "seismic_output": seismic,
+        }, index=pd.RangeIndex(start, start + n))
+
+
+def simulate_tectonic_emissions_and_seismic(
+    total_time_yr=1_000,
+    dt_yr=0.01,
+    V=1.2e-9,              # m/s (~3.8 cm/year)
+    k=5e10,                # Pa/m
+    sigma_mean=80e6,       # 80 MPa
+    sigma_std=10e6,        # 10 MPa
+    sigma_residual=0.0,    # 0 Pa after seismic reset
+    alpha_mean=2e-6,       # (1/s)
+    alpha_std=0.5e-6,      # (1/s)
+    stress_drop_seismic_threshold=20e8,  # 20 MPa
+    beta_seismic=1e-10,    # scaling of seismic energy
+    seed=None,
+    kernel=False,          # compute the sawtooth with array operations
+    chunk_steps=None       # if set, yield DataFrames of at most this many steps
+):
+    """
+    Return DataFrame with time, stress drop, emission Q, seismic output.
+
+    kernel=True replaces the per-step loop by _seismic_kernel_chunks, which
+    gives identical results for the same seed. Passing chunk_steps implies
+    the kernel and returns a generator of DataFrame chunks instead, so memory
+    stays bounded for multi-million-step runs.
+    """
+    
+    rng = np.random.default_rng(seed)
+    dt = dt_yr * 365.25 * 24 * 3600  # convert dt from years to seconds
+    total_steps = int(total_time_yr / dt_yr)
+
+    # State variables
+    slip = 0.0
+    sigma_c = rng.normal(sigma_mean, sigma_std)  # critical stress to rupture
+    alpha = rng.normal(alpha_mean, alpha_std)    # emission coefficient
+    stress = 0.0                                 # initial stress
+
+    if (kernel or chunk_steps is not None) and k * V * dt > 0:
+        chunks = _seismic_kernel_chunks(
+            rng, total_steps, dt_yr, dt, k * V * dt,
+            sigma_residual, alpha_mean, alpha_std,
+            stress_drop_seismic_threshold, beta_seismic,
+            chunk_steps or max(total_steps, 1), alpha
+        )
+        if chunk_steps is not None:
+            return chunks
+        return next(chunks, pd.DataFrame(columns=["time_years", "stress_Pa", "emission_Q", "seismic_output"]))
+
+    records = []
+
+    for step in range(total_steps):
+        t_years = step * dt_yr
+
+        # 1. Stress accumulation from plate motion
+        stress += k * V * dt
+
+        # 2. Continuous emission due to tension (NOT only at rupture)
+        Q = alpha * stress * dt  # emission proportional to current stress
+
+        if stress >= stress_drop_seismic_threshold:
+            seismic_output = beta_seismic * stress
+            stress = sigma_residual
+        else:
+            seismic_output = 0.0
+
+
+        alpha = rng.normal(alpha_mean, alpha_std)
+
+        # 4. Record
+        records.append((t_years, stress, Q, seismic_output))
+
+    df = pd.DataFrame(records, columns=["time_years", "stress_Pa", "emission_Q", "seismic_output"])
+    if chunk_steps is not None:
+        return (df.iloc[i:i + chunk_steps] for i in range(0, len(df), chunk_steps))
+    return df
@@ -0,0 +1,129 @@
+import json
+import time
+from contextlib import nullcontext
+
+
+SIMULATION_STAGES = (
+    "emission_generation",
+    "arrival_routing",
+    "diffusion",
+    "burst_detection",
+    "measurement",
+    "snapshotting",
+)
+SIMULATION_COUNTERS = ("arrivals", "bursts", "sensor_solves")
+
+
+class _StageTimer:
+    """Context manager adding its wall time to one stage of a SimulationMetrics."""
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.seconds[self.stage] = self.metrics.seconds.get(self.stage, 0.0) + elapsed
+        self.metrics.calls[self.stage] = self.metrics.calls.get(self.stage, 0) + 1
+
+
+class SimulationMetrics:
+    """
+    Instrumentation of the full simulations: wall time and call count per
+    stage (SIMULATION_STAGES), and the counters of SIMULATION_COUNTERS per
+    step and in total.
+
+    Every sample_every-th step a structured "step" event is passed to sink
+    (a callable taking a dict, e.g. JsonLinesSink), and close() sends a
+    final "summary" event. Without a sink, events are kept in self.events.
+    The simulations use NULL_METRICS when no metrics are given, whose
+    methods do nothing; counters that cost work to compute are only
+    evaluated when metrics.enabled is set.
+    """
+    enabled = True
+
+    def __init__(self, sink=None, sample_every=100):
+        self.sink = sink
+        self.sample_every = max(int(sample_every), 1)
+        self.events = []
+        self.seconds = {}
+        self.calls = {}
+        self.totals = dict.fromkeys(SIMULATION_COUNTERS, 0)
+        self.step_counts = dict.fromkeys(SIMULATION_COUNTERS, 0)
+        self.n_steps = 0
+        self.start = time.perf_counter()
+
+    def stage(self, name):
+        """`with metrics.stage(name):` times the block as that stage."""
+        return _StageTimer(self, name)
+
+    def count(self, name, n=1):
+        """Add n to a per-step counter of the current step."""
+        self.step_counts[name] = self.step_counts.get(name, 0) + int(n)
+
+    def end_step(self, t_idx):
+        """Close step t_idx; emits a step event if it is a sampled step."""
+        for name, n in self.step_counts.items():
+            self.totals[name] = self.totals.get(name, 0) + n
+        if self.n_steps % self.sample_every == 0:
+            self._emit({"event": "step", "t_idx": int(t_idx), **self._snapshot(),
+                        "step_counts": dict(self.step_counts)})
+        self.n_steps += 1
+        self.step_counts = dict.fromkeys(self.step_counts, 0)
+
+    def _snapshot(self):
+        return {
+            "wall_time_s": time.perf_counter() - self.start,
+            "n_steps": self.n_steps,
+            "stages": {s: {"seconds": self.seconds[s], "calls": self.calls[s]} for s in self.seconds},
+            "totals": dict(self.totals),
+        }
+
+    def _emit(self, event):
+        if self.sink is None:
+            self.events.append(event)
+        else:
+            self.sink(event)
+
+    def summary(self):
+        """Stage timings and counter totals so far, as a dict."""
+        return {"event": "summary", **self._snapshot()}
+
+    def close(self):
+        self._emit(self.summary())
+
+
+class _NullMetrics:
+    """Disabled instrumentation: every hook is a no-op."""
+    enabled = False
+    _null_stage = nullcontext()
+
+    def stage(self, name):
+        return self._null_stage
+
+    def count(self, name, n=1):
+        pass
+
+    def end_step(self, t_idx):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+
+
+class JsonLinesSink:
+    """SimulationMetrics sink appending every event as one JSON line to path."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(event) + "\n")
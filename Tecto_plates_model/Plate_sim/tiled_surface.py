@@ -0,0 +1,184 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .surface import BURST_BANDS, SurfaceHoleAccumulator, detect_ionization_bursts
+
+_worker = {}   # views of the shared arrays in a pool worker process, set by _init_worker
+
+
+def gaussian_radius(sigma, truncate=4.0):
+    """Support radius (cells) of gaussian_filter with the given truncate."""
+    return int(truncate * float(sigma) + 0.5)
+
+
+def tile_bounds(shape, tile_shape):
+    """(x0, x1, y0, y1) of the tiles covering an array of the given shape."""
+    nx, ny = shape
+    tx, ty = tile_shape
+    return [
+        (x0, min(x0 + tx, nx), y0, min(y0 + ty, ny))
+        for x0 in range(0, nx, tx)
+        for y0 in range(0, ny, ty)
+    ]
+
+
+def _attach(spec):
+    """Attach to the shared blocks described by spec; returns (handles, arrays)."""
+    handles, arrays = {}, {}
+    for name, (shm_name, shape, dtype) in spec["arrays"].items():
+        handles[name] = shared_memory.SharedMemory(name=shm_name)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=handles[name].buf)
+    return handles, arrays
+
+
+def _init_worker(spec):
+    """Pool initializer: attach this worker process to the shared arrays."""
+    handles, arrays = _attach(spec)
+    _worker["handles"] = handles
+    _worker["arrays"] = arrays
+    _worker["accumulator"] = SurfaceHoleAccumulator.from_attraction(
+        arrays["attraction"], spec["surface_diffusion_sigma"])
+
+
+def _run_tile(state, task):
+    """
+    Stamp the emissions reaching one tile and run the burst pass on it, in
+    place in the arrays of state. Returns the number of burst cells.
+    """
+    region, emissions, burst_kwargs = task
+    x0, x1, y0, y1 = region
+    arrays = state["arrays"]
+    holes = arrays["surface_holes"]
+
+    if len(emissions):
+        x, y, q = emissions.T
+        state["accumulator"].add_emissions(holes, x.astype(int), y.astype(int), q, region)
+
+    burst_mask, burst_energies = detect_ionization_bursts(holes[x0:x1, y0:y1], **burst_kwargs)
+    arrays["burst_energies"][x0:x1, y0:y1] = burst_energies
+    return int(burst_mask.sum())
+
+
+def _tile_step(task):
+    """Pool worker: _run_tile on the arrays attached by _init_worker."""
+    return _run_tile(_worker, task)
+
+
+class TiledSurface:
+    """
+    Tiled execution of the surface step (SurfaceHoleAccumulator.add_emissions
+    followed by detect_ionization_bursts) for large terrain grids.
+
+    surface_holes, the altitude attraction and the burst energies live in
+    shared memory. The map is cut into tile_shape tiles, and each step every
+    tile is handled by a worker process: it stamps the part of the stencils
+    falling inside the tile for the sources within a halo of the Gaussian
+    radius (truncate 4 sigma) around it, then runs the burst pass on the
+    tile. Tiles do not overlap, so no merge pass is needed and the result
+    is the one of the single-array path; worker memory is bounded by the
+    tile and stencil sizes, not the map size.
+
+    Use as a context manager, or call close(), to release the shared
+    memory. n_workers=1 runs the tiles in this process.
+    """
+
+    def __init__(
+        self,
+        terrain_map,                       # 2D array (or memmap): altitude map z(x,y)
+        tile_shape=(512, 512),             # cells per tile
+        surface_diffusion_sigma=1.0,       # sigma of lateral diffusion
+        altitude_attraction_strength=0.005,
+        n_workers=None                     # None → os.cpu_count(), 1 → this process
+    ):
+        self.shape = terrain_map.shape
+        self.tile_shape = tuple(tile_shape)
+        self.halo = gaussian_radius(surface_diffusion_sigma)
+        self.tiles = tile_bounds(self.shape, self.tile_shape)
+
+        self._handles = {}
+        spec = {"arrays": {}, "surface_diffusion_sigma": surface_diffusion_sigma}
+        for name, shape in (("attraction", self.shape),
+                            ("surface_holes", self.shape),
+                            ("burst_energies", self.shape + (len(BURST_BANDS),))):
+            nbytes = max(int(np.prod(shape)) * 8, 1)
+            self._handles[name] = shared_memory.SharedMemory(create=True, size=nbytes)
+            spec["arrays"][name] = (self._handles[name].name, shape, np.float64)
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=self._handles[name].buf)
+            for name, (_, shape, dtype) in spec["arrays"].items()
+        }
+        self.surface_holes = arrays["surface_holes"]
+        self.burst_energies = arrays["burst_energies"]
+        self.surface_holes[:] = 0.0
+
+        # attraction tile by tile, so a memmapped terrain is never loaded whole
+        z_mean = np.mean(terrain_map)
+        for x0, x1, y0, y1 in self.tiles:
+            arrays["attraction"][x0:x1, y0:y1] = (
+                1.0 + altitude_attraction_strength * (terrain_map[x0:x1, y0:y1] - z_mean))
+
+        # n_workers=1 keeps its state on the instance, so instances never share it
+        self._pool = None
+        self._local = None
+        if n_workers == 1:
+            self._local = {
+                "arrays": arrays,
+                "accumulator": SurfaceHoleAccumulator.from_attraction(
+                    arrays["attraction"], surface_diffusion_sigma),
+            }
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(spec,))
+
+    def _tile_emissions(self, emissions, region):
+        """Emissions whose stencil can reach the tile: sources within the halo."""
+        x0, x1, y0, y1 = region
+        x, y = emissions[:, 0], emissions[:, 1]
+        near = (x >= x0 - self.halo) & (x < x1 + self.halo) & (y >= y0 - self.halo) & (y < y1 + self.halo)
+        return emissions[near]
+
+    def step(
+        self,
+        x_idx_sources,
+        y_idx_sources,
+        emitted_holes,
+        hole_threshold=0.1,
+        gamma_conversion=1e5,
+        energy_distribution={"UV":0.4, "Vis-NIR":0.3, "IR":0.3}
+    ):
+        """
+        One time step over all tiles: add the emissions, then burst and reset.
+        surface_holes and burst_energies (shared arrays, overwritten by the
+        next step) hold the result; returns the number of burst cells.
+        """
+        emissions = np.column_stack([
+            np.asarray(x_idx_sources, dtype=float),
+            np.asarray(y_idx_sources, dtype=float),
+            np.asarray(emitted_holes, dtype=float),
+        ]).reshape(-1, 3)
+        burst_kwargs = {"hole_threshold": hole_threshold,
+                        "gamma_conversion": gamma_conversion,
+                        "energy_distribution": energy_distribution}
+        tasks = [(region, self._tile_emissions(emissions, region), burst_kwargs) for region in self.tiles]
+
+        if self._pool is None:
+            return sum(_run_tile(self._local, task) for task in tasks)
+        return sum(self._pool.map(_tile_step, tasks))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._local = None
+        self.surface_holes = self.burst_energies = None
+        for handle in self._handles.values():
+            handle.close()
+            handle.unlink()
+        self._handles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
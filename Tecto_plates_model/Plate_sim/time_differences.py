@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _time_differences_block(samples, prev, t_tot):
+    """
+    Vectorised step of compute_time_differences over consecutive samples.
+    t_tot is reset to the current sample whenever it rises above the
+    previous one; prev/t_tot carry that state between blocks.
+    """
+    n = len(samples)
+    reset = np.empty(n, dtype=bool)
+    reset[1:] = samples[1:] > samples[:-1]
+    reset[0] = prev is None or samples[0] > prev
+
+    # index of the last reset at or before each sample, -1 if none in this block
+    last_reset = np.maximum.accumulate(np.where(reset, np.arange(n), -1))
+    t = np.where(last_reset >= 0, samples[np.maximum(last_reset, 0)], t_tot)
+    delta_t = (t - samples) / t
+    return delta_t, samples[-1], t[-1]
+
+
+def iter_time_differences(
+    file_path,
+    stride=10000,                # keep every stride-th sample
+    chunksize=1_000_000,         # CSV rows parsed at a time
+    signal_dtype=np.float64      # np.float32 halves the chunk memory
+):
+    """
+    Streaming version of compute_time_differences for CSVs that do not fit
+    in memory (e.g. the ~629M-row LANL train.csv). Only the second column
+    is parsed, chunk by chunk, and the delta series is yielded as one array
+    per chunk. As in the original, a sample at row k is only used once rows
+    k..k+stride-1 exist.
+
+    file_path may also be a directory written by convert_acoustic_csv, in
+    which case the memory-mapped column is strided directly instead of
+    parsing text. Its values are then those of the stored dtype, float32
+    for time_to_failure under LANL_DTYPES, so deltas differ from the CSV
+    path by float32 rounding (~1e-7 relative).
+    """
+    if os.path.isdir(file_path):
+        from .acoustic_store import AcousticDataset
+        signal = AcousticDataset(file_path).column(1)
+        n_samples = len(signal) // stride
+        block = max(1, chunksize // stride)
+        prev, t_tot = None, None
+        for i in range(0, n_samples, block):
+            samples = signal[i * stride:min(i + block, n_samples) * stride:stride].astype(signal_dtype)
+            delta_t, prev, t_tot = _time_differences_block(samples, prev, t_tot)
+            yield delta_t
+        return
+
+    rows_seen = 0
+    pending = np.empty(0, dtype=signal_dtype)   # sampled values not yet confirmed
+    pending_k = 0                               # row of pending[0]
+    prev, t_tot = None, None
+
+    for chunk in pd.read_csv(file_path, usecols=[1], dtype=signal_dtype, chunksize=chunksize):
+        values = chunk.iloc[:, 0].to_numpy()
+        first = (-rows_seen) % stride
+        if not len(pending):
+            pending_k = rows_seen + first
+        pending = np.concatenate([pending, values[first::stride]])
+        rows_seen += len(values)
+
+        n_ready = min(len(pending), max(0, (rows_seen - stride - pending_k) // stride + 1))
+        if n_ready:
+            delta_t, prev, t_tot = _time_differences_block(pending[:n_ready], prev, t_tot)
+            pending = pending[n_ready:]
+            pending_k += n_ready * stride
+            yield delta_t
+
+
+def compute_time_differences(file_path, stride=10000, chunksize=1_000_000):
+    """
+    Relative drop (t_tot - t)/t_tot of every stride-th sample of the second
+    CSV column, t_tot being the last sample that rose above its predecessor.
+    Reads the file in chunks through iter_time_differences. For a converted
+    directory the samples are read at the stored precision (float32 under
+    LANL_DTYPES); convert with time_to_failure as np.float64 to match the
+    CSV results exactly.
+    """
+    results = []
+    for delta_t in iter_time_differences(file_path, stride=stride, chunksize=chunksize):
+        results.extend(delta_t.tolist())
+    return results
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from Plate_sim import window_features
+
+
+def fit_anomaly_model(features, contamination=0.01, random_state=42):
+    """StandardScaler + IsolationForest fitted on a (n_windows, 6) feature array, as in detect_anomalies."""
+    scaler = StandardScaler().fit(features)
+    model = IsolationForest(contamination=contamination, random_state=random_state)
+    model.fit(scaler.transform(features))
+    return scaler, model
+
+
+class OnlineAnomalyScorer:
+    """
+    Online version of the detect_anomalies pipeline for live sensor feeds.
+
+    The scaler and Isolation Forest are fitted once (fit / load) and then
+    only used to score incoming windows, one at a time (score_window), in
+    micro-batches (score_windows), or from a sample stream through the
+    generator stream() and the asyncio astream(). Scores are the
+    IsolationForest decision function (negative = anomalous) and flags use
+    detect_anomalies' 0 = normal / 1 = anomaly convention.
+
+    With refit_every set, the features of the last history_windows scored
+    windows are kept and every refit_every windows a refit is started on a
+    background thread; the new model replaces the old one when ready, so
+    the scoring path never waits for a fit.
+    """
+
+    def __init__(
+        self,
+        window=150,              # samples per window
+        contamination=0.01,
+        random_state=42,
+        refit_every=None,        # windows between background refits (None = never)
+        history_windows=100_000  # feature rows kept for refits
+    ):
+        self.window = window
+        self.contamination = contamination
+        self.random_state = random_state
+        self.refit_every = refit_every
+        self._fitted = None      # (scaler, model), swapped as a whole
+        self._history = deque(maxlen=history_windows)
+        self._since_refit = 0
+        self._refit_pool = None
+        self._refit_future = None
+        self._buffer = np.empty(0)
+        self._lock = threading.Lock()
+
+    # -- model lifecycle ---------------------------------------------------
+    def fit(self, signal=None, features=None):
+        """Fit on a raw signal (cut into windows) or on precomputed features."""
+        if features is None:
+            features = window_features(signal, self.window)
+        self._fitted = fit_anomaly_model(features, self.contamination, self.random_state)
+        self._history.extend(features)
+        return self
+
+    def save(self, path):
+        """Persist the fitted scaler and model."""
+        scaler, model = self._fitted
+        joblib.dump({"window": self.window, "contamination": self.contamination,
+                     "scaler": scaler, "model": model}, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        state = joblib.load(path)
+        scorer = cls(window=state["window"], contamination=state["contamination"], **kwargs)
+        scorer._fitted = (state["scaler"], state["model"])
+        return scorer
+
+    # -- scoring -------------------------------------------------------------
+    def score_features(self, features):
+        """(scores, flags) for a (n, 6) feature array."""
+        scaler, model = self._fitted
+        # one pass through the forest: predict() is decision_function() < 0
+        scores = model.score_samples(scaler.transform(features)) - model.offset_
+        flags = (scores < 0).astype(int)
+        if self.refit_every:
+            self._record(features)
+        return scores, flags
+
+    def score_windows(self, windows):
+        """(scores, flags) for a (n, window) micro-batch of samples."""
+        windows = np.asarray(windows, dtype=float).reshape(-1, self.window)
+        return self.score_features(window_features(windows.ravel(), self.window))
+
+    def score_window(self, samples):
+        """(score, flag) of a single window."""
+        scores, flags = self.score_windows(samples)
+        return scores[0], flags[0]
+
+    def stream(self, chunks):
+        """
+        Generator over an iterable of sample arrays of any length; yields
+        (scores, flags) for the windows completed by each chunk.
+        """
+        for chunk in chunks:
+            result = self.push(chunk)
+            if result is not None:
+                yield result
+
+    async def astream(self, chunks):
+        """asyncio counterpart of stream() for an async iterable of sample arrays."""
+        async for chunk in chunks:
+            result = self.push(chunk)
+            if result is not None:
+                yield result
+            await asyncio.sleep(0)
+
+    def push(self, samples):
+        """Append samples; score and return the completed windows, if any."""
+        self._buffer = np.concatenate([self._buffer, np.asarray(samples, dtype=float).ravel()])
+        n_windows = len(self._buffer) // self.window
+        if n_windows == 0:
+            return None
+        windows = self._buffer[:n_windows * self.window].reshape(n_windows, self.window)
+        self._buffer = self._buffer[n_windows * self.window:]
+        return self.score_windows(windows)
+
+    # -- background refits ------------------------------------------------------
+    def _record(self, features):
+        with self._lock:
+            self._history.extend(features)
+            self._since_refit += len(features)
+            due = self._since_refit >= self.refit_every
+            busy = self._refit_future is not None and not self._refit_future.done()
+            if not due or busy:
+                return
+            self._since_refit = 0
+            snapshot = np.array(self._history)
+        if self._refit_pool is None:
+            self._refit_pool = ThreadPoolExecutor(max_workers=1)
+        self._refit_future = self._refit_pool.submit(self._refit, snapshot)
+
+    def _refit(self, features):
+        fitted = fit_anomaly_model(features, self.contamination, self.random_state)
+        self._fitted = fitted   # a single reference swap, readers see old or new
+
+    def wait_for_refit(self):
+        """Block until a running background refit has finished (for tests and shutdown)."""
+        if self._refit_future is not None:
+            self._refit_future.result()
+
+    def close(self):
+        if self._refit_pool is not None:
+            self._refit_pool.shutdown(wait=True)
+            self._refit_pool = None
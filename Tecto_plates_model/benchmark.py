@@ -0,0 +1,345 @@
+"""
+Benchmark suite for the Plate_sim pipeline.
+
+Runs run_full_surface_hole_simulation_with_ionization on synthetic
+terrains with pinned seeds, times every stage through SimulationMetrics
+and reports the peak memory of each case. It also times the import of
+Plate_sim entry points in fresh interpreters and records which heavy
+dependencies they pull in. Results are written as JSON and can be compared
+with a saved baseline:
+
+    python benchmark.py tiny small --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 1.25
+
+Every case runs in a fresh process, so peak memory is per case. The exit
+status is 1 when a stage or an import is slower than tolerance x baseline,
+or an import loads a heavy module it did not load in the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+from Plate_sim import (
+    SIMULATION_STAGES,
+    RydbergDMTable,
+    SimulationMetrics,
+    run_full_surface_hole_simulation_with_ionization,
+    rydberg_dm_fixed_lasers,
+)
+
+# grid: terrain cells, snapshots: dense arrays or SparseSnapshots,
+# measurement: exact rydberg_dm_fixed_lasers solves or a RydbergDMTable,
+# tile_shape / n_workers: dense surface step on a TiledSurface
+BENCHMARK_CASES = {
+    "tiny":   dict(grid=(5, 5), n_steps=10, n_sensors=1, n_sources=1,
+                   snapshots="dense", measurement="exact"),
+    "small":  dict(grid=(100, 100), n_steps=1_000, n_sensors=10, n_sources=5,
+                   snapshots="dense", measurement="exact"),
+    "medium": dict(grid=(500, 500), n_steps=1_000, n_sensors=100, n_sources=20,
+                   snapshots="sparse", measurement="table"),
+    "large":  dict(grid=(2000, 2000), n_steps=100, n_sensors=1_000, n_sources=50,
+                   snapshots="sparse", measurement="table"),
+    "long":   dict(grid=(200, 200), n_steps=100_000, n_sensors=10, n_sources=5,
+                   snapshots="sparse", measurement="table"),
+    "tiled":  dict(grid=(1000, 1000), n_steps=20, n_sensors=100, n_sources=20,
+                   snapshots="dense", measurement="table", tile_shape=(250, 250), n_workers=4),
+}
+
+# import statements timed in a fresh interpreter each
+IMPORT_CASES = {
+    "surface": "from Plate_sim import SurfaceHoleAccumulator, detect_ionization_bursts",
+    "tectonic": "from Plate_sim import simulate_tectonic_emissions_and_seismic",
+    "simulation": "from Plate_sim import run_full_surface_hole_simulation_with_ionization",
+    "star": "from Plate_sim import *",
+}
+HEAVY_MODULES = ("pandas", "scipy", "matplotlib", "rydiqule", "qiskit", "tqdm", "xlrd")
+
+_IMPORT_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+try:
+    # ru_maxrss survives fork + exec on Linux, so it would report the parent's peak
+    with open("/proc/self/status") as f:
+        peak_mb = next(int(l.split()[1]) for l in f if l.startswith("VmHWM")) / 1024
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak_kb / 1024 if sys.platform != "darwin" else peak_kb / 1024**2
+print(json.dumps({{
+    "seconds": seconds,
+    "peak_rss_mb": peak_mb,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+SIM_PARAMS = dict(
+    hole_burst_threshold=1e-2,
+    gamma_conversion=1e5,
+    surface_diffusion_sigma=5,
+    altitude_attraction_strength=5,
+    v_upward=0.01,
+)
+MEASUREMENT_BLOCK_STEPS = 256     # steps per batched sensor solve
+TABLE_B_RANGE = (0.0, 1e8)        # T; covers the sensor fields of the synthetic cases
+
+
+def stage_timings(metrics):
+    """Seconds and calls of every SIMULATION_STAGES stage of a SimulationMetrics, 0 if it did not run."""
+    stages = metrics.summary()["stages"]
+    return {s: stages.get(s, {"seconds": 0.0, "calls": 0}) for s in SIMULATION_STAGES}
+
+
+def synthetic_terrain(shape, rng, smoothing=10, relief=0.05):
+    """Smoothed random altitude map, normalised to unit std and scaled by relief."""
+    z = gaussian_filter(rng.normal(size=shape), sigma=min(smoothing, min(shape) / 4))
+    return relief * z / (z.std() or 1.0)
+
+
+def synthetic_layout(shape, n_sources, n_sensors, max_arrival_yr, v_upward, rng):
+    """Random source (x, y, depth) and sensor (x, y) positions."""
+    nx, ny = shape
+    depth = rng.uniform(0, max_arrival_yr, n_sources) * v_upward * 365.25 * 24 * 3600
+    sources = list(zip(rng.integers(0, nx, n_sources).tolist(),
+                       rng.integers(0, ny, n_sources).tolist(),
+                       depth.tolist()))
+    sensors = list(zip(rng.integers(0, nx, n_sensors).tolist(),
+                       rng.integers(0, ny, n_sensors).tolist()))
+    return sources, sensors
+
+
+def run_case(grid, n_steps, n_sensors, n_sources, snapshots="dense", measurement="exact",
+             tile_shape=None, n_workers=None, seed=0):
+    """
+    One benchmark run of run_full_surface_hole_simulation_with_ionization,
+    its stages timed by a SimulationMetrics. Returns the per-stage timings
+    and run statistics.
+    """
+    rng = np.random.default_rng(seed)
+    terrain = synthetic_terrain(grid, rng)
+    sources, sensors = synthetic_layout(
+        grid, n_sources, n_sensors, max(1.0, min(10.0, n_steps / 10)), SIM_PARAMS["v_upward"], rng)
+    metrics = SimulationMetrics(sample_every=max(n_steps, 1))
+    wall_start = time.perf_counter()
+
+    if measurement == "table":
+        # the table build is part of the sensor stage's cost
+        with metrics.stage("measurement"):
+            measurement_function = RydbergDMTable(B_range=TABLE_B_RANGE)
+    else:
+        measurement_function = rydberg_dm_fixed_lasers
+
+    tectonic_emissions_df, _, _, _ = run_full_surface_hole_simulation_with_ionization(
+        terrain,
+        np.arange(grid[0]),
+        np.arange(grid[1]),
+        sources,
+        sensors,
+        measurement_function=measurement_function,
+        total_time_yr=n_steps,
+        dt_yr=1,
+        seed=seed,
+        measurement_block_steps=MEASUREMENT_BLOCK_STEPS,
+        surface_eps=0.0 if snapshots == "sparse" else None,
+        tile_shape=tile_shape,
+        n_workers=n_workers,
+        metrics=metrics,
+        **SIM_PARAMS
+    )
+
+    totals = metrics.summary()["totals"]
+    return {
+        "stages": stage_timings(metrics),
+        "total_seconds": time.perf_counter() - wall_start,
+        "n_time_steps": len(tectonic_emissions_df),
+        "n_arrivals": totals["arrivals"],
+        "n_bursts": totals["bursts"],
+        "n_sensor_solves": totals["sensor_solves"],
+    }
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process in MB."""
+    try:
+        # ru_maxrss survives fork + exec on Linux, so it would report the parent's peak
+        with open("/proc/self/status") as f:
+            return next(int(l.split()[1]) for l in f if l.startswith("VmHWM")) / 1024
+    except OSError:
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak_kb / 1024 if sys.platform != "darwin" else peak_kb / 1024**2
+
+
+def _run_case_measured(task):
+    """Worker: run_case in a fresh process, plus the peak RSS of that process."""
+    name, params, seed, repeat = task
+    runs = [run_case(seed=seed, **params) for _ in range(repeat)]
+    result = runs[0]
+    # best of the repeats per stage, as timing noise only adds time
+    for stage in SIMULATION_STAGES:
+        result["stages"][stage]["seconds"] = min(r["stages"][stage]["seconds"] for r in runs)
+    result["total_seconds"] = min(r["total_seconds"] for r in runs)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return name, {"params": params, "seed": seed, "repeat": repeat, **result}
+
+
+def measure_import(statement, repeat=3):
+    """
+    Time an import statement in fresh interpreters (best of repeat), from
+    this directory. Returns seconds, peak RSS and the HEAVY_MODULES loaded.
+    """
+    code = _IMPORT_PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["seconds"])
+    return {"statement": statement, "repeat": repeat, **best}
+
+
+def run_benchmarks(cases=None, seed=0, repeat=1, case_params=None, imports=True):
+    """
+    Run the named cases (default: all of BENCHMARK_CASES), each in its own
+    spawned process, and the IMPORT_CASES unless imports=False. Returns the
+    JSON-ready report.
+    """
+    case_params = BENCHMARK_CASES if case_params is None else case_params
+    cases = list(case_params) if cases is None else list(cases)
+    report = {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": {},
+        "imports": {},
+    }
+    if imports:
+        for name, statement in IMPORT_CASES.items():
+            report["imports"][name] = measure_import(statement, repeat=max(repeat, 3))
+    for name in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            _, result = pool.submit(_run_case_measured, (name, case_params[name], seed, repeat)).result()
+        report["cases"][name] = result
+    return report
+
+
+def compare_to_baseline(report, baseline, tolerance=1.25, min_seconds=1e-3):
+    """
+    Stages (and peak memory) of the cases present in both reports that got
+    worse by more than a factor tolerance. Stages under min_seconds in both
+    runs are ignored as noise. Imports are compared the same way, and any
+    heavy module an import loads that it did not load in the baseline is a
+    regression too. Returns a list of regression dicts.
+    """
+    regressions = []
+    for name, case in report["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        metrics = [(f"stages.{s}", case["stages"][s]["seconds"], base["stages"][s]["seconds"])
+                   for s in SIMULATION_STAGES if s in base["stages"]]
+        metrics.append(("peak_rss_mb", case["peak_rss_mb"], base["peak_rss_mb"]))
+        for metric, new, old in metrics:
+            if metric.startswith("stages.") and max(new, old) < min_seconds:
+                continue
+            if new > tolerance * old:
+                regressions.append({"case": name, "metric": metric, "baseline": old,
+                                    "current": new, "ratio": new / old if old else float("inf")})
+
+    for name, imp in report.get("imports", {}).items():
+        base = baseline.get("imports", {}).get(name)
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if imp[metric] > tolerance * base[metric]:
+                regressions.append({"case": f"import {name}", "metric": metric, "baseline": base[metric],
+                                    "current": imp[metric], "ratio": imp[metric] / base[metric]})
+        for module in sorted(set(imp["heavy_modules"]) - set(base["heavy_modules"])):
+            regressions.append({"case": f"import {name}", "metric": f"loads {module}", "baseline": 0,
+                                "current": 1, "ratio": float("inf")})
+    return regressions
+
+
+def format_report(report):
+    """Plain-text table of the per-stage timings."""
+    lines = []
+    for name, case in report["cases"].items():
+        p = case["params"]
+        tiles = ""
+        if p.get("tile_shape"):
+            tiles = f"{p['tile_shape'][0]}x{p['tile_shape'][1]} tiles on {p.get('n_workers') or 'all'} workers, "
+        lines.append(f"{name}: {p['grid'][0]}x{p['grid'][1]}, {p['n_steps']} steps, "
+                     f"{p['n_sensors']} sensors, {p['snapshots']} snapshots, {tiles}"
+                     f"total {case['total_seconds']:.3f} s, peak {case['peak_rss_mb']:.0f} MB")
+        for stage in SIMULATION_STAGES:
+            s = case["stages"][stage]
+            lines.append(f"    {stage:<20} {s['seconds']:>10.4f} s  ({s['calls']} calls)")
+    for name, imp in report.get("imports", {}).items():
+        lines.append(f"import {name:<12} {imp['seconds']:>8.3f} s, peak {imp['peak_rss_mb']:.0f} MB, "
+                     f"loads {', '.join(imp['heavy_modules']) or 'no heavy modules'}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Plate_sim pipeline stages.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(BENCHMARK_CASES)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, best time kept")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown factor")
+    parser.add_argument("--skip-imports", action="store_true", help="do not run the import benchmarks")
+    parser.add_argument("--tile-shape", type=int, nargs=2, metavar=("TX", "TY"),
+                        help="run the dense cases on a TiledSurface with these tiles")
+    parser.add_argument("--n-workers", type=int, help="TiledSurface worker processes (with --tile-shape)")
+    args = parser.parse_args(argv)
+    if args.n_workers is not None and args.tile_shape is None:
+        parser.error("--n-workers needs --tile-shape")
+
+    cases = args.cases or None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if cases is None:
+            cases = [c for c in baseline["cases"] if c in BENCHMARK_CASES]
+
+    case_params = BENCHMARK_CASES
+    if args.tile_shape is not None:
+        # tiling only applies to the dense surface
+        case_params = {
+            name: {**params, "tile_shape": tuple(args.tile_shape), "n_workers": args.n_workers}
+            if params["snapshots"] == "dense" else params
+            for name, params in BENCHMARK_CASES.items()
+        }
+    report = run_benchmarks(cases, seed=args.seed, repeat=args.repeat, case_params=case_params,
+                            imports=not args.skip_imports)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} "
+                  f"(x{r['ratio']:.2f})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Plate_sim import simulate_tectonic_emissions_and_seismic
+
+
+def expand_param_grid(param_grid):
+    """
+    Turn {"V": [..], "sigma_mean": [..]} into a list of parameter dicts
+    (cartesian product, keys in the given order). A list of dicts is
+    returned unchanged.
+    """
+    if isinstance(param_grid, dict):
+        keys = list(param_grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*param_grid.values())]
+    return [dict(p) for p in param_grid]
+
+
+def summarize_seismic_run(df, beta_seismic=1e-10, sigma_residual=0.0):
+    """Recurrence interval, event count and mean stress drop of one run."""
+    events = df["seismic_output"].values > 0
+    times = df["time_years"].values[events]
+    # stress before the reset is not stored; seismic_output = beta * stress
+    stress_drop = df["seismic_output"].values[events] / beta_seismic - sigma_residual
+
+    intervals = np.diff(times)
+    return {
+        "n_events": int(events.sum()),
+        "recurrence_interval_yr": intervals.mean() if len(intervals) else np.nan,
+        "stress_drop_mean_Pa": stress_drop.mean() if len(stress_drop) else np.nan,
+        "emission_Q_total": df["emission_Q"].values.sum(),
+    }
+
+
+def _run_ensemble_member(task):
+    """Worker: one realisation of simulate_tectonic_emissions_and_seismic."""
+    run_idx, grid_idx, seed, seed_seq, params, sim_kwargs = task
+    kwargs = {"kernel": True, **sim_kwargs, **params}
+    df = simulate_tectonic_emissions_and_seismic(seed=seed_seq, **kwargs)
+
+    stats = summarize_seismic_run(
+        df,
+        beta_seismic=kwargs.get("beta_seismic", 1e-10),
+        sigma_residual=kwargs.get("sigma_residual", 0.0),
+    )
+    return {"run": run_idx, "grid_point": grid_idx, "seed": seed, **params, **stats}
+
+
+def run_seismic_ensemble(
+    param_grid,
+    seeds,
+    n_workers=None,      # None → os.cpu_count(), 1 → run in this process
+    **sim_kwargs         # fixed arguments for every run (total_time_yr, dt_yr, ...)
+):
+    """
+    Monte Carlo sweep of simulate_tectonic_emissions_and_seismic.
+
+    Every (grid point, seed) pair gets its own child of SeedSequence(seed),
+    selected by grid index, so results do not depend on worker count or on
+    the order in which runs finish.
+
+    Returns (runs, summary): one row per run with the parameter columns and
+    per-run statistics, and the mean/std of those statistics per grid point.
+    """
+    grid = expand_param_grid(param_grid)
+    param_names = list(dict.fromkeys(k for p in grid for k in p))
+
+    tasks = []
+    for seed in seeds:
+        children = np.random.SeedSequence(seed).spawn(len(grid))
+        for grid_idx, params in enumerate(grid):
+            tasks.append((len(tasks), grid_idx, seed, children[grid_idx], params, sim_kwargs))
+
+    if n_workers == 1:
+        rows = [_run_ensemble_member(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            rows = list(pool.map(_run_ensemble_member, tasks, chunksize=max(1, len(tasks) // 64)))
+
+    runs = pd.DataFrame(rows).sort_values(["grid_point", "seed"], kind="stable").reset_index(drop=True)
+
+    stats = ["n_events", "recurrence_interval_yr", "stress_drop_mean_Pa", "emission_Q_total"]
+    summary = runs.groupby("grid_point", sort=True).agg(
+        **{name: (name, "first") for name in param_names},
+        n_runs=("run", "size"),
+        **{f"{s}_mean": (s, "mean") for s in stats},
+        **{f"{s}_std": (s, "std") for s in stats},
+    ).reset_index()
+
+    return runs, summary
@@ -0,0 +1,109 @@
+import numpy as np
+
+# per-sensor features of a 3-level density matrix, in density_matrix_features' order
+DM_FEATURE_NAMES = ("rho_00", "rho_11", "rho_22", "abs_rho_01", "abs_rho_12", "abs_rho_02", "purity")
+
+
+def density_matrix_features(rho):
+    """
+    Features of a stack of density matrices, rho of shape (..., 3, 3):
+    the three populations, the coherence magnitudes and the purity Tr(ρ²).
+    Works on the whole (nt, n_sensors, 3, 3) measurement tensor at once;
+    returns (..., 7) with columns DM_FEATURE_NAMES.
+    """
+    rho = np.asarray(rho)
+    out = np.empty(rho.shape[:-2] + (len(DM_FEATURE_NAMES),))
+    # diagonal and .real are views, only the feature array is written
+    out[..., 0:3] = np.diagonal(rho, axis1=-2, axis2=-1).real
+    out[..., 3] = np.abs(rho[..., 0, 1])
+    out[..., 4] = np.abs(rho[..., 1, 2])
+    out[..., 5] = np.abs(rho[..., 0, 2])
+    # ρ is Hermitian, so Tr(ρ²) = Σ|ρ_ij|²
+    out[..., 6] = np.einsum("...ij,...ij->...", rho.real, rho.real) + np.einsum("...ij,...ij->...", rho.imag, rho.imag)
+    return out
+
+
+class FusionStage:
+    """
+    Streaming fusion of the quantum (Rydberg) and seismic predictions.
+
+    Quantum stream: density matrices per time step and sensor, e.g. blocks of
+    measurement_map_times. Its score is the distance of the density-matrix
+    features from a reference reading (reference_rho, by default the first
+    matrix seen by each sensor, i.e. a calibration step).
+
+    Seismic stream: (time, score) pairs from the seismic model, e.g. the
+    negated OnlineAnomalyScorer decision function so that larger is more
+    anomalous. Each quantum step is matched to the latest seismic score at or
+    before its time (0 before the first one) via searchsorted, so neither
+    stream is copied or resampled.
+
+    fused = quantum_weight * quantum_score + seismic_weight * seismic_score
+    for every time step and sensor, flagged when above threshold. Only the
+    seismic scores not yet overtaken by the quantum stream are kept, so the
+    cost of a push does not depend on the history length.
+    """
+
+    def __init__(
+        self,
+        reference_rho=None,      # (3, 3) or (n_sensors, 3, 3) baseline reading
+        quantum_weight=0.5,
+        seismic_weight=0.5,
+        threshold=0.0
+    ):
+        self.reference_features = (
+            None if reference_rho is None else density_matrix_features(reference_rho)
+        )
+        self.quantum_weight = quantum_weight
+        self.seismic_weight = seismic_weight
+        self.threshold = threshold
+        self._seismic_times = np.empty(0)
+        self._seismic_scores = np.empty(0)
+        self._last_seismic = 0.0
+
+    def push_seismic(self, times, scores):
+        """Append seismic-model scores with their (increasing) times."""
+        self._seismic_times = np.concatenate([self._seismic_times, np.atleast_1d(times).astype(float)])
+        self._seismic_scores = np.concatenate([self._seismic_scores, np.atleast_1d(scores).astype(float)])
+
+    def seismic_at(self, times):
+        """Latest seismic score at or before each time; consumes overtaken scores."""
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        idx = np.searchsorted(self._seismic_times, times, side="right") - 1
+        # index -1 picks up the score carried over from earlier pushes
+        scores = np.append(self._seismic_scores, self._last_seismic)[idx]
+
+        used = idx.max() if len(idx) else -1
+        if used >= 0:
+            self._last_seismic = self._seismic_scores[used]
+            self._seismic_times = self._seismic_times[used + 1:]
+            self._seismic_scores = self._seismic_scores[used + 1:]
+        return scores
+
+    def quantum_score(self, rho):
+        """Feature distance of rho (n_steps, n_sensors, 3, 3) from the reference."""
+        features = density_matrix_features(rho)
+        if self.reference_features is None:
+            self.reference_features = features[0]
+        return np.linalg.norm(features - self.reference_features, axis=-1)
+
+    def push_quantum(self, times, rho):
+        """
+        Fuse a block of quantum measurements (n_steps, n_sensors, 3, 3) taken
+        at `times` with the seismic scores pushed so far.
+        Returns (fused, flags), both (n_steps, n_sensors).
+        """
+        q = self.quantum_score(rho)
+        s = self.seismic_at(times)[:, None]
+        fused = self.quantum_weight * q + self.seismic_weight * s
+        return fused, fused > self.threshold
+
+
+def fuse_predictions(times, measurement_map_times, seismic_times, seismic_scores, **kwargs):
+    """
+    Offline fusion of a whole run: measurement_map_times of a full simulation
+    with the seismic scores. Same computation as FusionStage, in one block.
+    """
+    stage = FusionStage(**kwargs)
+    stage.push_seismic(seismic_times, seismic_scores)
+    return stage.push_quantum(times, measurement_map_times)